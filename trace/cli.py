@@ -1,29 +1,34 @@
-import argparse
+import os
 import sys
 import time
-from typing import Optional, Tuple
-from .models import Note, Case, Evidence
-from .storage import Storage, StateManager
-from .crypto import Crypto
-
-def find_case(storage: Storage, identifier: str) -> Optional[Case]:
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+# Models, storage and crypto are imported inside the command functions (and
+# argparse inside _build_parser) so that `trace "note"`, `trace --help` and
+# other light paths don't pay for loading the whole stack.
+if TYPE_CHECKING:
+    import argparse
+    from .models import Note, Case, Evidence
+    from .storage import Storage, StateManager
+
+def find_case(storage: 'Storage', identifier: str) -> Optional['Case']:
     """Find a case by case_id (UUID) or case_number."""
-    for case in storage.cases:
-        if case.case_id == identifier or case.case_number == identifier:
-            return case
-    return None
+    return storage.get_case(identifier) or storage.get_case_by_number(identifier)
 
-def find_evidence(case: Case, identifier: str) -> Optional[Evidence]:
+def find_evidence(case: 'Case', identifier: str) -> Optional['Evidence']:
     """Find evidence by evidence_id (UUID) or name within a case."""
-    for evidence in case.evidence:
-        if evidence.evidence_id == identifier or evidence.name == identifier:
-            return evidence
-    return None
+    return case.get_evidence(identifier) or case.get_evidence_by_name(identifier)
 
-def show_context():
+def show_context(*, storage: Optional['Storage'] = None, state_manager: Optional['StateManager'] = None):
     """Display the current active context."""
-    state_manager = StateManager()
-    storage = Storage()
+    from .storage import Storage, StateManager
+
+    if storage is None:
+        storage = Storage(readonly=True)
+    if state_manager is None:
+        state_manager = StateManager()
 
     state = state_manager.get_active()
     case_id = state.get("case_id")
@@ -39,58 +44,73 @@ def show_context():
         print("Error: Active case not found in storage.")
         return
 
-    print(f"Active context:")
-    print(f"  Case: {case.case_number}", end="")
+    # Build the report as whole lines and write it once
+    case_line = f"  Case: {case.case_number}"
     if case.name:
-        print(f" - {case.name}", end="")
-    print(f" [{case.case_id[:8]}...]")
+        case_line += f" - {case.name}"
+    lines = ["Active context:", f"{case_line} [{case.case_id[:8]}...]"]
 
     if evidence_id:
         evidence = find_evidence(case, evidence_id)
         if evidence:
-            print(f"  Evidence: {evidence.name}", end="")
+            evidence_line = f"  Evidence: {evidence.name}"
             if evidence.description:
-                print(f" - {evidence.description}", end="")
-            print(f" [{evidence.evidence_id[:8]}...]")
+                evidence_line += f" - {evidence.description}"
+            lines.append(f"{evidence_line} [{evidence.evidence_id[:8]}...]")
         else:
-            print(f"  Evidence: [not found - stale reference]")
+            lines.append("  Evidence: [not found - stale reference]")
     else:
-        print(f"  Evidence: [none - notes will attach to case]")
+        lines.append("  Evidence: [none - notes will attach to case]")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
-def list_contexts():
+def list_contexts(*, storage: Optional['Storage'] = None):
     """List all cases and their evidence in a hierarchical format."""
-    storage = Storage()
+    from .storage import Storage
+
+    if storage is None:
+        storage = Storage(readonly=True)
 
     if not storage.cases:
         print("No cases found.")
         print("Use --new-case to create one, or open the TUI.")
         return
 
-    print("Cases and Evidence:")
-    for case in storage.cases:
+    lines = ["Cases and Evidence:"]
+    append = lines.append
+    for i, case in enumerate(storage.cases):
+        # Add blank line between cases for readability
+        if i:
+            append("")
+
         # Show case
-        print(f"  [{case.case_id[:8]}...] {case.case_number}", end="")
+        case_line = f"  [{case.case_id[:8]}...] {case.case_number}"
         if case.name:
-            print(f" - {case.name}", end="")
+            case_line += f" - {case.name}"
         if case.investigator:
-            print(f" (Investigator: {case.investigator})", end="")
-        print()
+            case_line += f" (Investigator: {case.investigator})"
+        append(case_line)
 
         # Show evidence under this case
         for evidence in case.evidence:
-            print(f"    [{evidence.evidence_id[:8]}...] {evidence.name}", end="")
             if evidence.description:
-                print(f" - {evidence.description}", end="")
-            print()
+                append(f"    [{evidence.evidence_id[:8]}...] {evidence.name} - {evidence.description}")
+            else:
+                append(f"    [{evidence.evidence_id[:8]}...] {evidence.name}")
 
-        # Add blank line between cases for readability
-        if storage.cases[-1] != case:
-            print()
+    # One write for the whole listing instead of several per row
+    sys.stdout.write("\n".join(lines) + "\n")
 
-def create_case(case_number: str, name: Optional[str] = None, investigator: Optional[str] = None):
+def create_case(case_number: str, name: Optional[str] = None, investigator: Optional[str] = None,
+                *, storage: Optional['Storage'] = None, state_manager: Optional['StateManager'] = None):
     """Create a new case and set it as active."""
-    storage = Storage()
-    state_manager = StateManager()
+    from .models import Case
+    from .storage import Storage, StateManager
+
+    if storage is None:
+        storage = Storage()
+    if state_manager is None:
+        state_manager = StateManager()
 
     # Check if case number already exists
     existing = find_case(storage, case_number)
@@ -100,8 +120,7 @@ def create_case(case_number: str, name: Optional[str] = None, investigator: Opti
 
     # Create new case
     case = Case(case_number=case_number, name=name, investigator=investigator)
-    storage.cases.append(case)
-    storage.save_data()
+    storage.add_case(case)
 
     # Set as active case
     state_manager.set_active(case.case_id, None)
@@ -113,10 +132,16 @@ def create_case(case_number: str, name: Optional[str] = None, investigator: Opti
         print(f"  Investigator: {investigator}")
     print(f"✓ Set as active case")
 
-def create_evidence(name: str, description: Optional[str] = None):
+def create_evidence(name: str, description: Optional[str] = None,
+                    *, storage: Optional['Storage'] = None, state_manager: Optional['StateManager'] = None):
     """Create new evidence and attach to active case."""
-    storage = Storage()
-    state_manager = StateManager()
+    from .models import Evidence
+    from .storage import Storage, StateManager
+
+    if storage is None:
+        storage = Storage()
+    if state_manager is None:
+        state_manager = StateManager()
 
     state = state_manager.get_active()
     case_id = state.get("case_id")
@@ -138,8 +163,7 @@ def create_evidence(name: str, description: Optional[str] = None):
 
     # Create new evidence
     evidence = Evidence(name=name, description=description)
-    case.evidence.append(evidence)
-    storage.save_data()
+    storage.add_evidence(case, evidence)
 
     # Set as active evidence
     state_manager.set_active(case.case_id, evidence.evidence_id)
@@ -150,10 +174,14 @@ def create_evidence(name: str, description: Optional[str] = None):
     print(f"✓ Added to case '{case.case_number}'")
     print(f"✓ Set as active evidence")
 
-def switch_case(identifier: str):
+def switch_case(identifier: str, *, storage: Optional['Storage'] = None, state_manager: Optional['StateManager'] = None):
     """Switch active case context."""
-    storage = Storage()
-    state_manager = StateManager()
+    from .storage import Storage, StateManager
+
+    if storage is None:
+        storage = Storage(readonly=True)
+    if state_manager is None:
+        state_manager = StateManager()
 
     case = find_case(storage, identifier)
     if not case:
@@ -168,10 +196,14 @@ def switch_case(identifier: str):
     if case.name:
         print(f"  {case.name}")
 
-def switch_evidence(identifier: str):
+def switch_evidence(identifier: str, *, storage: Optional['Storage'] = None, state_manager: Optional['StateManager'] = None):
     """Switch active evidence context within the active case."""
-    storage = Storage()
-    state_manager = StateManager()
+    from .storage import Storage, StateManager
+
+    if storage is None:
+        storage = Storage(readonly=True)
+    if state_manager is None:
+        state_manager = StateManager()
 
     state = state_manager.get_active()
     case_id = state.get("case_id")
@@ -198,9 +230,15 @@ def switch_evidence(identifier: str):
     if evidence.description:
         print(f"  {evidence.description}")
 
-def quick_add_note(content: str, case_override: Optional[str] = None, evidence_override: Optional[str] = None):
-    storage = Storage()
-    state_manager = StateManager()
+def quick_add_note(content: str, case_override: Optional[str] = None, evidence_override: Optional[str] = None,
+                   *, storage: Optional['Storage'] = None, state_manager: Optional['StateManager'] = None):
+    from .models import Note
+    from .storage import Storage, StateManager
+
+    if storage is None:
+        storage = Storage()
+    if state_manager is None:
+        state_manager = StateManager()
 
     # Validate and clear stale state
     warning = state_manager.validate_and_clear_stale(storage)
@@ -241,7 +279,7 @@ def quick_add_note(content: str, case_override: Optional[str] = None, evidence_o
         evidence_id = state.get("evidence_id")
         if evidence_id:
             # Find and validate evidence belongs to active case
-            target_evidence = find_evidence(case, evidence_id)
+            target_evidence = case.get_evidence(evidence_id)
 
             if not target_evidence:
                 # Evidence ID is set but doesn't exist in case - clear it
@@ -251,111 +289,173 @@ def quick_add_note(content: str, case_override: Optional[str] = None, evidence_o
     # Create note
     note = Note(content=content)
     note.calculate_hash()
-    note.extract_tags()  # Extract hashtags from content
-    note.extract_iocs()  # Extract IOCs from content
-
-    # Try signing the hash if enabled
-    signature = None
-    if settings.get("pgp_enabled", True):
-        gpg_key_id = settings.get("gpg_key_id", None)
-        if gpg_key_id:
+
+    # Signing only needs the hash, so gpg runs while tags and IOCs are extracted
+    pgp_enabled = settings.get("pgp_enabled", True)
+    gpg_key_id = settings.get("gpg_key_id", None) if pgp_enabled else None
+    signer = None
+    signatures = []
+    if gpg_key_id:
+        import threading
+        from .crypto import Crypto
+
+        def sign():
             # Sign only the hash (hash already includes timestamp:content for integrity)
-            signature = Crypto.sign_content(note.content_hash, key_id=gpg_key_id)
-            if signature:
-                note.signature = signature
-            else:
-                print("Warning: GPG signature failed (GPG not found or no key). Note saved without signature.", file=sys.stderr)
+            signatures.append(Crypto.sign_content(note.content_hash, key_id=gpg_key_id))
+
+        signer = threading.Thread(target=sign, daemon=True)
+        signer.start()
+
+    note.extract_all()  # Extract hashtags and IOCs from content
+
+    # Collect the signature if signing is enabled
+    if signer:
+        signer.join()
+        if signatures and signatures[0]:
+            note.signature = signatures[0]
         else:
-            print("Warning: No GPG key ID configured. Note saved without signature.", file=sys.stderr)
+            print("Warning: GPG signature failed (GPG not found or no key). Note saved without signature.", file=sys.stderr)
+    elif pgp_enabled:
+        print("Warning: No GPG key ID configured. Note saved without signature.", file=sys.stderr)
 
-    # Attach to evidence or case
+    # Attach to evidence or case (appended to the note journal, not a full rewrite)
+    storage.append_note(case, target_evidence, note)
     if target_evidence:
-        target_evidence.notes.append(note)
         print(f"✓ Note added to evidence '{target_evidence.name}'")
     else:
-        case.notes.append(note)
         print(f"✓ Note added to case '{case.case_number}'")
 
-    storage.save_data()
+def _export_header() -> str:
+    return f"# Forensic Notes Export\n\nGenerated on: {time.ctime()}\n\n"
+
+def _case_export_chunks(case: 'Case') -> List[str]:
+    """Return the markdown for one case (notes and evidence) as a list of chunks."""
+    chunks = []
+    add = chunks.append
+    fmt_note = format_note_for_export
+    ctime = _cached_ctime
 
-def export_markdown(output_file: str = "export.md"):
+    add(f"## Case: {case.case_number}\n")
+    if case.name:
+        add(f"**Name:** {case.name}\n")
+    if case.investigator:
+        add(f"**Investigator:** {case.investigator}\n")
+    add(f"**Case ID:** {case.case_id}\n\n")
+
+    add("### Case Notes\n")
+    if not case.notes:
+        add("_No notes._\n")
+    for note in case.notes:
+        add(fmt_note(note, ctime=ctime))
+
+    add("\n### Evidence\n")
+    if not case.evidence:
+        add("_No evidence._\n")
+
+    for ev in case.evidence:
+        add(f"#### Evidence: {ev.name}\n")
+        if ev.description:
+            add(f"_{ev.description}_\n")
+        add(f"**ID:** {ev.evidence_id}\n")
+
+        # Include source hash if available
+        source_hash = ev.metadata.get("source_hash")
+        if source_hash:
+            add(f"**Source Hash:** `{source_hash}`\n")
+        add("\n")
+
+        add("##### Evidence Notes\n")
+        if not ev.notes:
+            add("_No notes._\n")
+        for note in ev.notes:
+            add(fmt_note(note, ctime=ctime))
+        add("\n")
+    add("---\n\n")
+    return chunks
+
+def _iter_export_lines(storage: 'Storage') -> Iterator[str]:
+    """Yield the markdown export document piece by piece."""
+    yield _export_header()
+    for case in storage.cases:
+        yield from _case_export_chunks(case)
+
+def _iter_export_batches(storage: 'Storage') -> Iterator[str]:
+    """Yield the export document as one string per case (plus the header)."""
+    yield _export_header()
+    for case in storage.cases:
+        yield "".join(_case_export_chunks(case))
+
+@contextmanager
+def _export_writer(output_file: str) -> Iterator[Callable[[bytes], None]]:
+    """Open output_file on a raw file descriptor and yield a write(bytes) function.
+
+    Writes go to os.write directly, bypassing the text and buffered io layers;
+    the data is flushed to disk when the block exits.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(output_file, flags, 0o600)
     try:
-        storage = Storage()
-        state_manager = StateManager()
-        settings = state_manager.get_settings()
+        def write(data: bytes):
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+
+        yield write
+        getattr(os, "fdatasync", os.fsync)(fd)
+    finally:
+        os.close(fd)
+
+# Encoded batches are coalesced until this many bytes are pending, so many
+# small cases don't cost one write syscall each
+_EXPORT_WRITE_SIZE = 1 << 20
+
+def _write_export_file(output_file: str, batches: Iterable[str]):
+    """Write text batches to output_file as UTF-8, encoding each batch once."""
+    with _export_writer(output_file) as write:
+        pending = bytearray()
+        for batch in batches:
+            pending += batch.encode('utf-8')
+            if len(pending) >= _EXPORT_WRITE_SIZE:
+                write(pending)
+                pending.clear()
+        if pending:
+            write(pending)
+
+def export_markdown(output_file: str = "export.md", *, storage: Optional['Storage'] = None, state_manager: Optional['StateManager'] = None):
+    from .storage import Storage, StateManager
 
-        # Build the export content in memory first
-        content_lines = []
-        content_lines.append("# Forensic Notes Export\n\n")
-        content_lines.append(f"Generated on: {time.ctime()}\n\n")
-
-        for case in storage.cases:
-            content_lines.append(f"## Case: {case.case_number}\n")
-            if case.name:
-                content_lines.append(f"**Name:** {case.name}\n")
-            if case.investigator:
-                content_lines.append(f"**Investigator:** {case.investigator}\n")
-            content_lines.append(f"**Case ID:** {case.case_id}\n\n")
-
-            content_lines.append("### Case Notes\n")
-            if not case.notes:
-                content_lines.append("_No notes._\n")
-            for note in case.notes:
-                note_content = format_note_for_export(note)
-                content_lines.append(note_content)
-
-            content_lines.append("\n### Evidence\n")
-            if not case.evidence:
-                content_lines.append("_No evidence._\n")
-
-            for ev in case.evidence:
-                content_lines.append(f"#### Evidence: {ev.name}\n")
-                if ev.description:
-                    content_lines.append(f"_{ev.description}_\n")
-                content_lines.append(f"**ID:** {ev.evidence_id}\n")
-
-                # Include source hash if available
-                source_hash = ev.metadata.get("source_hash")
-                if source_hash:
-                    content_lines.append(f"**Source Hash:** `{source_hash}`\n")
-                content_lines.append("\n")
-
-                content_lines.append("##### Evidence Notes\n")
-                if not ev.notes:
-                    content_lines.append("_No notes._\n")
-                for note in ev.notes:
-                    note_content = format_note_for_export(note)
-                    content_lines.append(note_content)
-                content_lines.append("\n")
-            content_lines.append("---\n\n")
-
-        # Join all content
-        export_content = "".join(content_lines)
+    try:
+        if storage is None:
+            storage = Storage(readonly=True)
+        if state_manager is None:
+            state_manager = StateManager()
+        settings = state_manager.get_settings()
+        pgp_enabled = settings.get("pgp_enabled", False)
+        gpg_key_id = settings.get("gpg_key_id", None) if pgp_enabled else None
+        signed_export = False
 
         # Sign the entire export if GPG is enabled
-        if settings.get("pgp_enabled", False):
-            gpg_key_id = settings.get("gpg_key_id", None)
-            signed_export = Crypto.sign_content(export_content, key_id=gpg_key_id)
+        if pgp_enabled:
+            from .crypto import Crypto
+
+            # Pipe the document through gpg and its clearsigned output into the file
+            with _export_writer(output_file) as write:
+                signed_export = Crypto.sign_stream(_iter_export_lines(storage), write, key_id=gpg_key_id)
 
             if signed_export:
-                # Write the signed version
-                final_content = signed_export
                 print(f"✓ Export signed with GPG")
             else:
                 # Signing failed - write unsigned
-                final_content = export_content
+                _write_export_file(output_file, _iter_export_batches(storage))
                 print("⚠ Warning: GPG signing failed. Export saved unsigned.", file=sys.stderr)
         else:
-            final_content = export_content
-
-        # Write to file
-        with open(output_file, "w", encoding='utf-8') as f:
-            f.write(final_content)
+            # Unsigned export is streamed straight to the file, one case per batch
+            _write_export_file(output_file, _iter_export_batches(storage))
 
         print(f"✓ Exported to {output_file}")
 
         # Show verification instructions
-        if settings.get("pgp_enabled", False) and signed_export:
+        if signed_export:
             print(f"\nTo verify the export:")
             print(f"  gpg --verify {output_file}")
 
@@ -363,56 +463,60 @@ def export_markdown(output_file: str = "export.md"):
         print(f"Error: Failed to export to {output_file}: {e}")
         sys.exit(1)
 
-def format_note_for_export(note: Note) -> str:
+@lru_cache(maxsize=4096)
+def _ctime_seconds(seconds: int) -> str:
+    return time.ctime(seconds)
+
+def _cached_ctime(timestamp: float) -> str:
+    """time.ctime() memoized per whole second (ctime drops the fraction anyway)."""
+    return _ctime_seconds(int(timestamp))
+
+def _indent_lines(text: str) -> str:
+    """Indent every line of text by four spaces, each ending with a newline."""
+    lines = text.splitlines()
+    if not lines:
+        return ""
+    return "    " + "\n    ".join(lines) + "\n"
+
+def format_note_for_export(note: 'Note', *, ctime: Callable[[float], str] = _cached_ctime) -> str:
     """Format a single note for export (returns string instead of writing to file)
 
     Includes Unix timestamp for hash reproducibility - anyone can recompute the hash
     using the formula: SHA256("{unix_timestamp}:{content}")
     """
-    lines = []
-    lines.append(f"- **{time.ctime(note.timestamp)}**\n")
-    lines.append(f"  - Unix Timestamp: `{note.timestamp}` (for hash verification)\n")
-    lines.append(f"  - Content:\n")
-    # Properly indent multi-line content
-    for line in note.content.splitlines():
-        lines.append(f"    {line}\n")
-    lines.append(f"  - SHA256 Hash (timestamp:content): `{note.content_hash}`\n")
-    if note.signature:
-        lines.append("  - **GPG Signature of Hash:**\n")
-        lines.append("    ```\n")
+    parts = [
+        f"- **{ctime(note.timestamp)}**\n"
+        f"  - Unix Timestamp: `{note.timestamp}` (for hash verification)\n"
+        "  - Content:\n",
+        # Properly indent multi-line content
+        _indent_lines(note.content),
+        f"  - SHA256 Hash (timestamp:content): `{note.content_hash}`\n",
+    ]
+    signature = note.signature
+    if signature:
         # Indent signature for markdown block
-        for line in note.signature.splitlines():
-            lines.append(f"    {line}\n")
-        lines.append("    ```\n")
-    lines.append("\n")
-    return "".join(lines)
-
-def main():
-    parser = argparse.ArgumentParser(
-        description="trace: Forensic Note Taking Tool",
-        epilog="Examples:\n"
-               "  trace 'Found suspicious process'     Add note to active context\n"
-               "  trace --stdin < output.txt           Add file contents as note\n"
-               "  trace --list                         List all cases and evidence\n"
-               "  trace --new-case 2024-001            Create new case\n"
-               "  trace --switch-case 2024-001         Switch active case\n",
-        formatter_class=argparse.RawDescriptionHelpFormatter
-    )
+        parts.append("  - **GPG Signature of Hash:**\n    ```\n")
+        parts.append(_indent_lines(signature))
+        parts.append("    ```\n")
+    parts.append("\n")
+    return "".join(parts)
 
+def _add_note_arguments(parser: 'argparse.ArgumentParser'):
     # Note content (positional or stdin)
     parser.add_argument("note", nargs="?", help="Quick note content to add to active context")
     parser.add_argument("--stdin", action="store_true", help="Read note content from stdin")
 
+    # Temporary overrides for note addition
+    parser.add_argument("--case", metavar="IDENTIFIER", help="Use specific case for this note (doesn't change active)")
+    parser.add_argument("--evidence", metavar="IDENTIFIER", help="Use specific evidence for this note (doesn't change active)")
+
+def _add_context_arguments(parser: 'argparse.ArgumentParser'):
     # Context management
     parser.add_argument("--show-context", action="store_true", help="Show active case and evidence")
     parser.add_argument("--list", action="store_true", help="List all cases and evidence")
     parser.add_argument("--switch-case", metavar="IDENTIFIER", help="Switch active case (by ID or case number)")
     parser.add_argument("--switch-evidence", metavar="IDENTIFIER", help="Switch active evidence (by ID or name)")
 
-    # Temporary overrides for note addition
-    parser.add_argument("--case", metavar="IDENTIFIER", help="Use specific case for this note (doesn't change active)")
-    parser.add_argument("--evidence", metavar="IDENTIFIER", help="Use specific evidence for this note (doesn't change active)")
-
     # Case and evidence creation
     parser.add_argument("--new-case", metavar="CASE_NUMBER", help="Create new case")
     parser.add_argument("--name", metavar="NAME", help="Name for new case")
@@ -420,73 +524,125 @@ def main():
     parser.add_argument("--new-evidence", metavar="EVIDENCE_NAME", help="Create new evidence in active case")
     parser.add_argument("--description", metavar="DESC", help="Description for new evidence")
 
-    # Export
+def _add_export_arguments(parser: 'argparse.ArgumentParser'):
     parser.add_argument("--export", action="store_true", help="Export all data to Markdown file")
     parser.add_argument("--output", metavar="FILE", default="trace_export.md", help="Output file for export")
 
-    # TUI
+def _add_tui_arguments(parser: 'argparse.ArgumentParser'):
     parser.add_argument("--open", "-o", action="store_true", help="Open TUI directly at active case/evidence")
 
-    args = parser.parse_args()
+def _build_parser() -> 'argparse.ArgumentParser':
+    import argparse
 
-    # Handle context management commands
-    if args.show_context:
-        show_context()
-        return
+    parser = argparse.ArgumentParser(
+        description="trace: Forensic Note Taking Tool",
+        epilog="Examples:\n"
+               "  trace 'Found suspicious process'     Add note to active context\n"
+               "  trace --stdin < output.txt           Add file contents as note\n"
+               "  trace --list                         List all cases and evidence\n"
+               "  trace --new-case 2024-001            Create new case\n"
+               "  trace --switch-case 2024-001         Switch active case\n",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    _add_note_arguments(parser)
+    _add_context_arguments(parser)
+    _add_export_arguments(parser)
+    _add_tui_arguments(parser)
+    return parser
 
-    if args.list:
-        list_contexts()
-        return
+def _launch_tui(open_active: bool = False):
+    """Run the first-run wizard if needed, then start the TUI.
 
-    if args.switch_case:
-        switch_case(args.switch_case)
-        return
+    The wizard and TUI modules are only imported here so that note, export
+    and context commands never load them.
+    """
+    from .gpg_wizard import check_and_run_wizard
+    check_and_run_wizard()
 
-    if args.switch_evidence:
-        switch_evidence(args.switch_evidence)
-        return
+    # Launch TUI (with optional direct navigation to active context)
+    try:
+        from .tui_app import run_tui
+        run_tui(open_active=open_active)
+    except ImportError as e:
+        print(f"Error launching TUI: {e}")
+        # For development debugging, it might be useful to see full traceback
+        import traceback
+        traceback.print_exc()
 
-    # Handle case/evidence creation
-    if args.new_case:
-        create_case(args.new_case, name=args.name, investigator=args.investigator)
-        return
+def main():
+    argv = sys.argv[1:]
 
-    if args.new_evidence:
-        create_evidence(args.new_evidence, description=args.description)
+    # Fast path: `trace "note"` is a single bare positional, which the full
+    # parser would map to args.note with every other option at its default.
+    if len(argv) == 1 and argv[0] and not argv[0].startswith("-"):
+        quick_add_note(argv[0])
         return
 
-    # Handle export
-    if args.export:
-        export_markdown(args.output)
+    args = _build_parser().parse_args(argv)
+
+    # No command given - launch TUI (it opens storage and holds the lock itself)
+    if not (args.show_context or args.list or args.switch_case or args.switch_evidence
+            or args.new_case or args.new_evidence or args.export or args.stdin or args.note):
+        _launch_tui(open_active=args.open)
         return
 
-    # Handle note addition
-    if args.stdin:
-        # Read from stdin
+    # Read a --stdin note before opening storage: `tail -f log | trace --stdin`
+    # blocks here until the pipe closes and must not hold the lock meanwhile
+    content = args.note
+    if args.stdin and not (args.show_context or args.list or args.switch_case or args.switch_evidence
+                           or args.new_case or args.new_evidence or args.export):
         content = sys.stdin.read().strip()
         if not content:
             print("Error: No content provided from stdin.", file=sys.stderr)
             sys.exit(1)
-        quick_add_note(content, case_override=args.case, evidence_override=args.evidence)
-        return
 
-    if args.note:
-        quick_add_note(args.note, case_override=args.case, evidence_override=args.evidence)
-        return
+    from .storage import Storage, StateManager
 
-    # No arguments - check for first run and launch TUI
-    from .gpg_wizard import check_and_run_wizard
-    check_and_run_wizard()
+    # Whichever command runs below shares one storage/state pair; commands that
+    # only read skip the lock so they don't wait on (or block) a writer
+    readonly = bool(args.show_context or args.list or args.switch_case or args.switch_evidence
+                    or (args.export and not (args.new_case or args.new_evidence)))
+    storage = Storage(readonly=readonly)
+    state_manager = StateManager()
 
-    # Launch TUI (with optional direct navigation to active context)
-    try:
-        from .tui_app import run_tui
-        run_tui(open_active=args.open)
-    except ImportError as e:
-        print(f"Error launching TUI: {e}")
-        # For development debugging, it might be useful to see full traceback
-        import traceback
-        traceback.print_exc()
+    # Commands save through storage; the write happens once, when the command ends
+    with storage.deferred_save():
+        # Handle context management commands
+        if args.show_context:
+            show_context(storage=storage, state_manager=state_manager)
+            return
+
+        if args.list:
+            list_contexts(storage=storage)
+            return
+
+        if args.switch_case:
+            switch_case(args.switch_case, storage=storage, state_manager=state_manager)
+            return
+
+        if args.switch_evidence:
+            switch_evidence(args.switch_evidence, storage=storage, state_manager=state_manager)
+            return
+
+        # Handle case/evidence creation
+        if args.new_case:
+            create_case(args.new_case, name=args.name, investigator=args.investigator,
+                        storage=storage, state_manager=state_manager)
+            return
+
+        if args.new_evidence:
+            create_evidence(args.new_evidence, description=args.description,
+                            storage=storage, state_manager=state_manager)
+            return
+
+        # Handle export
+        if args.export:
+            export_markdown(args.output, storage=storage, state_manager=state_manager)
+            return
+
+        # Handle note addition (from the command line, or stdin as read above)
+        quick_add_note(content, case_override=args.case, evidence_override=args.evidence,
+                       storage=storage, state_manager=state_manager)
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,53 @@
+import os
+import re
 import subprocess
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Union
+
+# A clearsigned message holds at least these three armor lines, so anything
+# shorter can be rejected without starting gpg
+_CLEARSIGN_HEADER = "-----BEGIN PGP SIGNED MESSAGE-----"
+_MIN_CLEARSIGNED_LEN = (len(_CLEARSIGN_HEADER) + len("-----BEGIN PGP SIGNATURE-----")
+                        + len("-----END PGP SIGNATURE-----"))
+
+# `sec`/`uid` records of `gpg --with-colons`: group 2 is field 4 (key ID) and
+# group 3 is field 9 (user ID); either is None when the record is too short
+_GPG_KEY_RECORD = re.compile(
+    r'^(sec|uid):(?:(?:[^:\n]*:){3}([^:\n]*)(?::(?:[^:\n]*:){4}([^:\n]*))?)?',
+    re.MULTILINE,
+)
+
 
 class Crypto:
+    # Results of is_gpg_available() and list_gpg_keys() (keyed by GNUPGHOME),
+    # kept for the lifetime of the process - see clear_cache()
+    _gpg_available = None
+    _gpg_keys_cache = {}
+
+    @staticmethod
+    def clear_cache():
+        """Forget cached GPG availability and key listings (e.g. after creating a key)."""
+        Crypto._gpg_available = None
+        Crypto._gpg_keys_cache.clear()
+
     @staticmethod
     def is_gpg_available() -> bool:
         """
         Check if GPG is available on the system.
 
+        The result is cached for the lifetime of the process.
+
         Returns:
             True if GPG is available, False otherwise.
         """
+        if Crypto._gpg_available is None:
+            Crypto._gpg_available = Crypto._check_gpg_available()
+        return Crypto._gpg_available
+
+    @staticmethod
+    def _check_gpg_available() -> bool:
         try:
             proc = subprocess.Popen(
                 ['gpg', '--version'],
@@ -35,18 +73,17 @@ class Crypto:
             - verified: True if signature is valid, False otherwise
             - signer_info: Information about the signer (key ID, name) or error message
         """
-        if not signed_content or not signed_content.strip():
+        if not signed_content or signed_content.isspace():
             return False, "No signature present"
 
         # Check if content looks like a GPG signed message
-        if "-----BEGIN PGP SIGNED MESSAGE-----" not in signed_content:
+        if len(signed_content) < _MIN_CLEARSIGNED_LEN or _CLEARSIGN_HEADER not in signed_content:
             return False, "Not a GPG signed message"
 
         try:
             # Force English output for consistent parsing across locales
             # Linux/macOS: LC_ALL/LANG variables control GPG's output language
             # Windows: GPG may ignore these, but encoding='utf-8' + errors='replace' provides robustness
-            import os
             env = os.environ.copy()
             # Use C.UTF-8 for English messages with UTF-8 encoding support
             # Falls back gracefully via errors='replace' if locale not available
@@ -107,7 +144,20 @@ class Crypto:
         """
         List available GPG secret keys.
         Returns a list of tuples: (key_id, user_id)
+
+        Successful listings are cached per GNUPGHOME for the lifetime of the process.
         """
+        keyring = os.environ.get('GNUPGHOME', '')
+        keys = Crypto._gpg_keys_cache.get(keyring)
+        if keys is None:
+            keys = Crypto._list_gpg_keys_uncached()
+            if keys is not None:
+                Crypto._gpg_keys_cache[keyring] = keys
+        return list(keys or [])
+
+    @staticmethod
+    def _list_gpg_keys_uncached():
+        """Run gpg to list secret keys. Returns None if gpg failed."""
         try:
             proc = subprocess.Popen(
                 ['gpg', '--list-secret-keys', '--with-colons'],
@@ -118,31 +168,46 @@ class Crypto:
             stdout, stderr = proc.communicate(timeout=10)
 
             if proc.returncode != 0:
-                return []
+                return None
 
             keys = []
             current_key_id = None
 
-            for line in stdout.split('\n'):
-                fields = line.split(':')
-                if len(fields) < 2:
-                    continue
+            # Only sec/uid records matter, so match those directly instead of
+            # splitting every line (fpr, grp, ssb, ...) into fields
+            for record in _GPG_KEY_RECORD.finditer(stdout):
+                record_type, key_id, user_id = record.groups()
 
                 # sec = secret key
-                if fields[0] == 'sec':
+                if record_type == 'sec':
                     # Key ID is in field 4 (short) or we can extract from field 5 (fingerprint)
-                    current_key_id = fields[4] if len(fields) > 4 else None
+                    current_key_id = key_id
 
                 # uid = user ID
-                elif fields[0] == 'uid' and current_key_id:
-                    user_id = fields[9] if len(fields) > 9 else "Unknown"
-                    keys.append((current_key_id, user_id))
+                elif current_key_id:
+                    keys.append((current_key_id, user_id if user_id is not None else "Unknown"))
                     # Don't reset current_key_id - allow multiple UIDs per key
 
             return keys
 
         except (FileNotFoundError, subprocess.TimeoutExpired):
-            return []  # GPG not installed or timed out
+            return None  # GPG not installed or timed out
+
+    @staticmethod
+    def _sign_command(key_id: str = None) -> List[str]:
+        """Build the gpg clearsign command line.
+
+        gpg has no persistent signing service (`gpg --server` rejects SIGN) and
+        gpg-agent already stays resident between calls, so what remains per
+        signature is gpg's own startup. --no-auto-check-trustdb skips the
+        periodic trust database check, which clearsigning never needs.
+        """
+        cmd = ['gpg', '--no-auto-check-trustdb', '--clearsign', '--output', '-']
+
+        # Add specific key if provided
+        if key_id:
+            cmd.extend(['--local-user', key_id])
+        return cmd
 
     @staticmethod
     def sign_content(content: str, key_id: str = None) -> str:
@@ -156,34 +221,134 @@ class Crypto:
         Returns:
             The clearsigned content or empty string if GPG fails.
         """
-        try:
-            # Build command
-            cmd = ['gpg', '--clearsign', '--output', '-']
+        if not content:
+            return ""  # Nothing worth a gpg process
 
-            # Add specific key if provided
-            if key_id:
-                cmd.extend(['--local-user', key_id])
+        try:
+            cmd = Crypto._sign_command(key_id)
 
+            # Bytes pipes with an explicit UTF-8 round trip: text=True would
+            # encode through the locale's codec, which may not be UTF-8
             proc = subprocess.Popen(
                 cmd,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stderr=subprocess.PIPE
             )
-            stdout, stderr = proc.communicate(input=content, timeout=10)
+            stdout, stderr = proc.communicate(input=content.encode('utf-8'), timeout=10)
 
             if proc.returncode != 0:
                 # Fallback: maybe no key is found or gpg error
                 # In a real app we might want to log this 'stderr'
                 return ""
 
-            return stdout
+            return stdout.decode('utf-8', errors='replace')
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return "" # GPG not installed or timed out
 
     @staticmethod
-    def hash_content(content: str, timestamp: float) -> str:
+    def sign_many(contents: List[str], key_id: str = None, max_parallel: int = None) -> List[str]:
+        """
+        Sign several contents, overlapping the gpg processes.
+
+        gpg can't clearsign several messages in one invocation (and `gpg --server`
+        doesn't implement SIGN), so each content still gets its own process.
+        A pool of max_parallel threads keeps that many processes running, and
+        a new one starts as soon as any finishes, so one slow signature does
+        not hold back the rest.
+
+        Args:
+            contents: The contents to sign
+            key_id: Optional GPG key ID to use. If None, uses default key.
+            max_parallel: Processes in flight at once (default: CPU count)
+
+        Returns:
+            The clearsigned contents in input order ("" where signing failed
+            or the content was empty).
+        """
+        results = [""] * len(contents)
+        # Empty contents stay "" without a gpg process, as in sign_content()
+        pending = [i for i, content in enumerate(contents) if content]
+        if not pending:
+            return results
+
+        def sign(i):
+            # An error signing one content leaves only that result empty
+            try:
+                return Crypto.sign_content(contents[i], key_id=key_id)
+            except Exception:
+                return ""
+
+        window = min(max_parallel or os.cpu_count() or 1, len(pending))
+        with ThreadPoolExecutor(max_workers=window) as pool:
+            signatures = pool.map(sign, pending)
+            for i, signature in zip(pending, signatures):
+                results[i] = signature
+
+        return results
+
+    @staticmethod
+    def sign_stream(chunks: Iterable[str], write: Callable[[bytes], None],
+                    key_id: str = None, timeout: float = 60) -> bool:
+        """
+        Clearsign a stream of text without holding it in memory.
+
+        The chunks are fed to gpg's stdin from a background thread while the
+        clearsigned output is read back and passed to write() as it arrives.
+
+        Args:
+            chunks: Text chunks to sign, encoded as UTF-8
+            write: Callback receiving the signed output bytes
+            key_id: Optional GPG key ID to use. If None, uses default key.
+            timeout: Seconds after which gpg is killed
+
+        Returns:
+            True if gpg signed the full input. On False, whatever was passed
+            to write() must be discarded.
+        """
+        cmd = Crypto._sign_command(key_id)
+
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            return False  # GPG not installed
+
+        def feed():
+            try:
+                for chunk in chunks:
+                    proc.stdin.write(chunk.encode('utf-8'))
+            except OSError:
+                pass  # gpg exited early; reported through its return code
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        killer = threading.Timer(timeout, proc.kill)
+        feeder.start()
+        killer.start()
+        try:
+            for block in iter(lambda: proc.stdout.read(65536), b''):
+                write(block)
+            feeder.join()
+            return proc.wait() == 0
+        except Exception:
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            killer.cancel()
+            proc.stdout.close()
+
+    @staticmethod
+    def hash_content(content: Union[str, bytes], timestamp: float) -> str:
         """Calculate SHA256 hash of timestamp:content.
 
         Hash input format: "{timestamp}:{content}"
@@ -194,7 +359,7 @@ class Crypto:
         - Ensures integrity of both WHAT was said and WHEN it was said
 
         Args:
-            content: The note content to hash
+            content: The note content to hash (str, or already UTF-8 encoded bytes)
             timestamp: Unix epoch timestamp as float
 
         Returns:
@@ -204,5 +369,31 @@ class Crypto:
             >>> hash_content("Suspicious process detected", 1702345678.123456)
             Computes SHA256 of: "1702345678.123456:Suspicious process detected"
         """
-        data = f"{timestamp}:{content}".encode('utf-8')
-        return hashlib.sha256(data).hexdigest()
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        hasher = hashlib.sha256(f"{timestamp}:".encode('utf-8'))
+        hasher.update(content)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def bulk_verify(notes: Iterable) -> List:
+        """Recompute the hash of many notes and report the ones that don't match.
+
+        Same formula as hash_content(), with the per-call setup hoisted out of
+        the loop and each note's cached UTF-8 content reused.
+
+        Args:
+            notes: Notes to check (anything with timestamp, content_hash and
+                   encoded_content())
+
+        Returns:
+            The notes whose stored content_hash differs from the recomputed one
+        """
+        sha256 = hashlib.sha256
+        mismatched = []
+        for note in notes:
+            hasher = sha256(f"{note.timestamp}:".encode('utf-8'))
+            hasher.update(note.encoded_content())
+            if hasher.hexdigest() != note.content_hash:
+                mismatched.append(note)
+        return mismatched
@@ -2,5 +2,6 @@
 
 from .tag_extractor import TagExtractor
 from .ioc_extractor import IOCExtractor
+from .combined_extractor import CombinedExtractor
 
-__all__ = ['TagExtractor', 'IOCExtractor']
+__all__ = ['TagExtractor', 'IOCExtractor', 'CombinedExtractor']
@@ -0,0 +1,119 @@
+"""Single-pass extraction of tags and IOCs from note content"""
+
+from functools import lru_cache
+from typing import List, Tuple
+
+from .ioc_extractor import IOCExtractor, _compile_ioc_regex, _ioc_regex_for
+from .tag_extractor import _TAG_RE
+
+
+class CombinedExtractor:
+    """Extract hashtags and IOCs with one scan over the text"""
+
+    # The tag alternative only consumes the '#' and captures the word in a
+    # lookahead, so an IOC starting right after the '#' is still found.
+    # IOC alternatives follow in IOCExtractor's priority order. Highlighting
+    # scans with the same pattern, so it sees the IOCs extract_tags_and_iocs()
+    # stores (e.g. 'abc.def.com' in '#abc.def.com').
+    COMBINED_TAG = r'#(?=(?P<tag>\w+))'
+    COMBINED_PATTERN = _compile_ioc_regex(COMBINED_TAG)
+
+    @staticmethod
+    def extract_tags_and_iocs(text: str) -> Tuple[List[str], List[str]]:
+        """
+        Extract tags and IOCs from text in a single regex pass
+
+        Args:
+            text: The text to extract from
+
+        Returns:
+            Tuple of (tags, iocs): unique lowercase tags and unique IOC
+            strings, both in order of first appearance
+        """
+        if '#' not in text and not IOCExtractor.may_contain_iocs(text):
+            return [], []
+
+        tags = []
+        iocs = []
+        seen_tags = set()
+        seen_iocs = set()
+
+        def add_tag(tag):
+            tag = tag.lower()
+            if tag not in seen_tags:
+                seen_tags.add(tag)
+                tags.append(tag)
+
+        pattern = _ioc_regex_for(text, CombinedExtractor.COMBINED_TAG)
+        for match in pattern.finditer(text):
+            kind = match.lastgroup
+            if kind == 'tag':
+                add_tag(match.group('tag'))
+                continue
+
+            ioc = match.group()
+            # URLs are the only IOCs that can swallow a '#tag' (fragment)
+            if kind == 'url' and '#' in ioc:
+                for tag in _TAG_RE.findall(ioc):
+                    add_tag(tag)
+            # Filter out common false positives
+            if kind == 'domain' and ioc.startswith('example.'):
+                continue
+            if ioc not in seen_iocs:
+                seen_iocs.add(ioc)
+                iocs.append(ioc)
+
+        return tags, iocs
+
+    # Display lines whose highlight spans are remembered; the TUI asks again
+    # for every visible line on each redraw
+    HIGHLIGHT_CACHE_SIZE = 2048
+
+    @staticmethod
+    @lru_cache(maxsize=HIGHLIGHT_CACHE_SIZE)
+    def extract_highlights(text: str) -> Tuple[Tuple[str, int, int, str], ...]:
+        """
+        Find tag and IOC spans to highlight in a single regex pass
+
+        Results are cached per text, so redrawing an unchanged line does not
+        rescan it.
+
+        Args:
+            text: The text to scan (typically one display line)
+
+        Returns:
+            Tuple of non-overlapping (text, start_pos, end_pos, kind) tuples in
+            order of position, where kind is 'tag' or 'ioc'
+        """
+        if '#' not in text and not IOCExtractor.may_contain_iocs(text):
+            return ()
+
+        highlights = []
+        # The latest '#word' span, held back until it is known whether an IOC
+        # starts inside it; IOCs take priority over tags they overlap
+        tag = None
+        pattern = _ioc_regex_for(text, CombinedExtractor.COMBINED_TAG)
+        for match in pattern.finditer(text):
+            kind = match.lastgroup
+            start = match.start()
+            if kind == 'tag':
+                if tag is not None:
+                    highlights.append(tag)
+                end = match.end('tag')
+                tag = (text[start:end], start, end, 'tag')
+                continue
+
+            matched = match.group()
+            # Filter out common false positives
+            if kind == 'domain' and matched.startswith('example.'):
+                continue
+            if tag is not None:
+                if start >= tag[2]:
+                    highlights.append(tag)
+                tag = None
+            highlights.append((matched, start, match.end(), 'ioc'))
+
+        if tag is not None:
+            highlights.append(tag)
+        return tuple(highlights)
+
@@ -1,21 +1,66 @@
 """IOC (Indicator of Compromise) extraction logic for notes"""
 
 import re
-from typing import List, Tuple
+from functools import lru_cache
+from typing import ClassVar, Iterator, List, Tuple
 
 
 class IOCExtractor:
     """Extract Indicators of Compromise from text content"""
 
+    # Shortest IOC without '.' or ':' (an MD5 hash)
+    MIN_HASH_LENGTH = 32
+
     # Regex patterns for different IOC types
     SHA256_PATTERN = r'\b[a-fA-F0-9]{64}\b'
     SHA1_PATTERN = r'\b[a-fA-F0-9]{40}\b'
     MD5_PATTERN = r'\b[a-fA-F0-9]{32}\b'
-    IPV4_PATTERN = r'\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b'
+    # The leading lookahead only restates the dotted-quad shape, so digit runs
+    # such as dates, times and version numbers fail before the octet branches
+    IPV4_PATTERN = r'(?=\d{1,3}\.\d{1,3}\.\d{1,3}\.\d)\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b'
     IPV6_PATTERN = r'\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b|\b(?:[0-9a-fA-F]{1,4}:)*::(?:[0-9a-fA-F]{1,4}:)*[0-9a-fA-F]{0,4}\b'
     URL_PATTERN = r'https?://[^\s<>\"\']+(?<![.,;:!?\)\]\}])'
     DOMAIN_PATTERN = r'\b(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}\b'
-    EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'
+
+    # (type, pattern) in matching priority order: longest hashes first,
+    # URLs before domains. Shared with CombinedExtractor.
+    IOC_PATTERNS: ClassVar[Tuple[Tuple[str, str], ...]] = (
+        ('sha256', SHA256_PATTERN),
+        ('sha1', SHA1_PATTERN),
+        ('md5', MD5_PATTERN),
+        ('ipv4', IPV4_PATTERN),
+        ('ipv6', IPV6_PATTERN),
+        ('url', URL_PATTERN),
+        ('domain', DOMAIN_PATTERN),
+        ('email', EMAIL_PATTERN),
+    )
+
+    @staticmethod
+    def may_contain_iocs(text: str) -> bool:
+        """
+        Cheap screen run before the regex: URLs, IPs, domains and emails all
+        need a '.' or ':', and hashes need at least MIN_HASH_LENGTH characters.
+        """
+        return '.' in text or ':' in text or len(text) >= IOCExtractor.MIN_HASH_LENGTH
+
+    @staticmethod
+    def _iter_iocs(text: str) -> Iterator[Tuple[re.Match, str]]:
+        """
+        Yield (match, ioc_type) for every IOC in text, in order of position
+
+        One pass over all patterns; at each position the alternatives are
+        tried in priority order and matches never overlap.
+        """
+        if not IOCExtractor.may_contain_iocs(text):
+            return
+
+        for match in _ioc_regex_for(text).finditer(text):
+            ioc_type = match.lastgroup
+            # Filter out common false positives
+            if ioc_type == 'domain' and match.group().startswith('example.'):
+                continue
+            yield match, ioc_type
 
     @staticmethod
     def extract_iocs(text: str) -> List[str]:
@@ -26,61 +71,16 @@ class IOCExtractor:
             text: The text to extract IOCs from
 
         Returns:
-            List of unique IOC strings
+            List of unique IOC strings, in order of first appearance
         """
         seen = set()
-        covered_ranges = set()
         iocs = []
 
-        def add_ioc_if_not_covered(match_obj):
-            """Add IOC if its range doesn't overlap with already covered ranges"""
-            start, end = match_obj.start(), match_obj.end()
-            # Check if this range overlaps with any covered range
-            for covered_start, covered_end in covered_ranges:
-                if not (end <= covered_start or start >= covered_end):
-                    return False  # Overlaps, don't add
-            ioc_text = match_obj.group()
+        for match, _ in IOCExtractor._iter_iocs(text):
+            ioc_text = match.group()
             if ioc_text not in seen:
                 seen.add(ioc_text)
-                covered_ranges.add((start, end))
                 iocs.append(ioc_text)
-                return True
-            return False
-
-        # Process in order of priority to avoid false positives
-        # SHA256 hashes (64 hex chars) - check longest first to avoid substring matches
-        for match in re.finditer(IOCExtractor.SHA256_PATTERN, text):
-            add_ioc_if_not_covered(match)
-
-        # SHA1 hashes (40 hex chars)
-        for match in re.finditer(IOCExtractor.SHA1_PATTERN, text):
-            add_ioc_if_not_covered(match)
-
-        # MD5 hashes (32 hex chars)
-        for match in re.finditer(IOCExtractor.MD5_PATTERN, text):
-            add_ioc_if_not_covered(match)
-
-        # IPv4 addresses
-        for match in re.finditer(IOCExtractor.IPV4_PATTERN, text):
-            add_ioc_if_not_covered(match)
-
-        # IPv6 addresses (supports compressed format)
-        for match in re.finditer(IOCExtractor.IPV6_PATTERN, text):
-            add_ioc_if_not_covered(match)
-
-        # URLs (check before domains to prevent double-matching)
-        for match in re.finditer(IOCExtractor.URL_PATTERN, text):
-            add_ioc_if_not_covered(match)
-
-        # Domain names (basic pattern)
-        for match in re.finditer(IOCExtractor.DOMAIN_PATTERN, text):
-            # Filter out common false positives
-            if not match.group().startswith('example.'):
-                add_ioc_if_not_covered(match)
-
-        # Email addresses
-        for match in re.finditer(IOCExtractor.EMAIL_PATTERN, text):
-            add_ioc_if_not_covered(match)
 
         return iocs
 
@@ -93,56 +93,16 @@ class IOCExtractor:
             text: The text to extract IOCs from
 
         Returns:
-            List of (ioc_text, ioc_type) tuples
+            List of unique (ioc_text, ioc_type) tuples, in order of first appearance
         """
         iocs = []
         seen = set()
-        covered_ranges = set()
-
-        def add_ioc_if_not_covered(match_obj, ioc_type):
-            """Add IOC if its range doesn't overlap with already covered ranges"""
-            start, end = match_obj.start(), match_obj.end()
-            # Check if this range overlaps with any covered range
-            for covered_start, covered_end in covered_ranges:
-                if not (end <= covered_start or start >= covered_end):
-                    return False  # Overlaps, don't add
-            ioc_text = match_obj.group()
+
+        for match, ioc_type in IOCExtractor._iter_iocs(text):
+            ioc_text = match.group()
             if ioc_text not in seen:
                 seen.add(ioc_text)
-                covered_ranges.add((start, end))
                 iocs.append((ioc_text, ioc_type))
-                return True
-            return False
-
-        # Process in priority order: longest hashes first
-        for match in re.finditer(IOCExtractor.SHA256_PATTERN, text):
-            add_ioc_if_not_covered(match, 'sha256')
-
-        for match in re.finditer(IOCExtractor.SHA1_PATTERN, text):
-            add_ioc_if_not_covered(match, 'sha1')
-
-        for match in re.finditer(IOCExtractor.MD5_PATTERN, text):
-            add_ioc_if_not_covered(match, 'md5')
-
-        for match in re.finditer(IOCExtractor.IPV4_PATTERN, text):
-            add_ioc_if_not_covered(match, 'ipv4')
-
-        for match in re.finditer(IOCExtractor.IPV6_PATTERN, text):
-            add_ioc_if_not_covered(match, 'ipv6')
-
-        # URLs (check before domains to avoid double-matching)
-        for match in re.finditer(IOCExtractor.URL_PATTERN, text):
-            add_ioc_if_not_covered(match, 'url')
-
-        # Domain names
-        for match in re.finditer(IOCExtractor.DOMAIN_PATTERN, text):
-            # Filter out common false positives
-            if not match.group().startswith('example.'):
-                add_ioc_if_not_covered(match, 'domain')
-
-        # Email addresses
-        for match in re.finditer(IOCExtractor.EMAIL_PATTERN, text):
-            add_ioc_if_not_covered(match, 'email')
 
         return iocs
 
@@ -155,60 +115,17 @@ class IOCExtractor:
             text: The text to extract IOCs from
 
         Returns:
-            List of (ioc_text, start_pos, end_pos, ioc_type) tuples
+            List of non-overlapping (ioc_text, start_pos, end_pos, ioc_type) tuples,
+            sorted by position
         """
-        highlights = []
-        covered_ranges = set()
-
-        def overlaps(start, end):
-            """Check if range overlaps with any covered range"""
-            for covered_start, covered_end in covered_ranges:
-                if not (end <= covered_start or start >= covered_end):
-                    return True
-            return False
-
-        def add_highlight(match, ioc_type):
-            """Add highlight if it doesn't overlap with existing ones"""
-            start, end = match.start(), match.end()
-            if not overlaps(start, end):
-                highlights.append((match.group(), start, end, ioc_type))
-                covered_ranges.add((start, end))
-
-        # Process in priority order: longest hashes first to avoid substring matches
-        for match in re.finditer(IOCExtractor.SHA256_PATTERN, text):
-            add_highlight(match, 'sha256')
-
-        for match in re.finditer(IOCExtractor.SHA1_PATTERN, text):
-            add_highlight(match, 'sha1')
-
-        for match in re.finditer(IOCExtractor.MD5_PATTERN, text):
-            add_highlight(match, 'md5')
-
-        for match in re.finditer(IOCExtractor.IPV4_PATTERN, text):
-            add_highlight(match, 'ipv4')
-
-        for match in re.finditer(IOCExtractor.IPV6_PATTERN, text):
-            add_highlight(match, 'ipv6')
-
-        # URLs (check before domains to prevent double-matching)
-        for match in re.finditer(IOCExtractor.URL_PATTERN, text):
-            add_highlight(match, 'url')
-
-        # Domain names
-        for match in re.finditer(IOCExtractor.DOMAIN_PATTERN, text):
-            if not match.group().startswith('example.'):
-                add_highlight(match, 'domain')
-
-        # Email addresses
-        for match in re.finditer(IOCExtractor.EMAIL_PATTERN, text):
-            add_highlight(match, 'email')
-
-        return highlights
+        return [(match.group(), match.start(), match.end(), ioc_type)
+                for match, ioc_type in IOCExtractor._iter_iocs(text)]
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def classify_ioc(ioc: str) -> str:
         """
-        Classify an IOC by its type
+        Classify an IOC by its type (memoized: the same IOCs recur across notes)
 
         Args:
             ioc: The IOC string to classify
@@ -216,21 +133,59 @@ class IOCExtractor:
         Returns:
             The IOC type as a string
         """
-        if re.fullmatch(IOCExtractor.SHA256_PATTERN, ioc):
+        if _SHA256_RE.fullmatch(ioc):
             return 'sha256'
-        elif re.fullmatch(IOCExtractor.SHA1_PATTERN, ioc):
+        elif _SHA1_RE.fullmatch(ioc):
             return 'sha1'
-        elif re.fullmatch(IOCExtractor.MD5_PATTERN, ioc):
+        elif _MD5_RE.fullmatch(ioc):
             return 'md5'
-        elif re.fullmatch(IOCExtractor.IPV4_PATTERN, ioc):
+        elif _IPV4_RE.fullmatch(ioc):
             return 'ipv4'
-        elif re.fullmatch(IOCExtractor.IPV6_PATTERN, ioc):
+        elif _IPV6_RE.fullmatch(ioc):
             return 'ipv6'
-        elif re.fullmatch(IOCExtractor.EMAIL_PATTERN, ioc):
+        elif _EMAIL_RE.fullmatch(ioc):
             return 'email'
-        elif re.fullmatch(IOCExtractor.URL_PATTERN, ioc):
+        elif _URL_RE.fullmatch(ioc):
             return 'url'
-        elif re.fullmatch(IOCExtractor.DOMAIN_PATTERN, ioc):
+        elif _DOMAIN_RE.fullmatch(ioc):
             return 'domain'
         else:
             return 'unknown'
+
+
+# Compiled once at import; the methods above look them up at call time
+_SHA256_RE = re.compile(IOCExtractor.SHA256_PATTERN)
+_SHA1_RE = re.compile(IOCExtractor.SHA1_PATTERN)
+_MD5_RE = re.compile(IOCExtractor.MD5_PATTERN)
+_IPV4_RE = re.compile(IOCExtractor.IPV4_PATTERN)
+_IPV6_RE = re.compile(IOCExtractor.IPV6_PATTERN)
+_URL_RE = re.compile(IOCExtractor.URL_PATTERN)
+_DOMAIN_RE = re.compile(IOCExtractor.DOMAIN_PATTERN)
+_EMAIL_RE = re.compile(IOCExtractor.EMAIL_PATTERN)
+
+@lru_cache(maxsize=None)
+def _compile_ioc_regex(prefix: str = '', absent: Tuple[str, ...] = (), ascii: bool = False) -> re.Pattern:
+    """
+    Compile all IOC patterns as one alternation of named groups in priority
+    order (match.lastgroup is the IOC type), optionally preceded by another
+    alternative and leaving out the IOC types in absent
+    """
+    alternatives = [prefix] if prefix else []
+    alternatives.extend(f'(?P<{ioc_type}>{pattern})'
+                        for ioc_type, pattern in IOCExtractor.IOC_PATTERNS if ioc_type not in absent)
+    return re.compile('|'.join(alternatives), re.ASCII if ascii else 0)
+
+
+def _ioc_regex_for(text: str, prefix: str = '') -> re.Pattern:
+    """
+    Pick the cheapest alternation that finds the same matches in text.
+
+    IOC types needing a character that text lacks are left out (URLs and
+    IPv6 need ':', emails need '@'); such alternatives could never match, yet
+    the engine would try them at every position. ASCII-only text gets the
+    re.ASCII build, where \w, \s and \b behave identically but test cheaper.
+    """
+    absent = () if ':' in text else ('ipv6', 'url')
+    if '@' not in text:
+        absent += ('email',)
+    return _compile_ioc_regex(prefix, absent, text.isascii())
@@ -19,16 +19,19 @@ class TagExtractor:
         Returns:
             List of unique tags in lowercase, preserving order
         """
+        if '#' not in text:
+            return []
+
         # Match hashtags: # followed by word characters
-        matches = re.findall(TagExtractor.TAG_PATTERN, text)
-
-        # Convert to lowercase and remove duplicates while preserving order
-        seen = set()
-        tags = []
-        for tag in matches:
-            tag_lower = tag.lower()
-            if tag_lower not in seen:
-                seen.add(tag_lower)
-                tags.append(tag_lower)
-
-        return tags
+        matches = (_TAG_ASCII_RE if text.isascii() else _TAG_RE).findall(text)
+
+        # Convert to lowercase and remove duplicates while preserving order;
+        # dict.fromkeys does the ordered dedup without a Python-level loop
+        return list(dict.fromkeys(map(str.lower, matches)))
+
+
+# Compiled once at import; the methods above look it up at call time
+_TAG_RE = re.compile(TagExtractor.TAG_PATTERN)
+# re.ASCII twin for ASCII-only text; non-ASCII text keeps Unicode \w so
+# tags like #über stay whole
+_TAG_ASCII_RE = re.compile(TagExtractor.TAG_PATTERN, re.ASCII)
@@ -20,17 +20,13 @@ Key objectives:
 - Document timeline of events
 
 #incident-response #data-breach #investigation""")
-    case_note1.calculate_hash()
-    case_note1.extract_tags()
-    case_note1.extract_iocs()
+    case_note1.finalize_content()
     demo_case.notes.append(case_note1)
 
     case_note2 = Note(content="""Investigation lead: Employee reported suspicious email from sender@phishing-domain.com
 Initial analysis shows potential credential harvesting attempt.
 Review email headers and attachments for IOCs. #phishing #email-analysis""")
-    case_note2.calculate_hash()
-    case_note2.extract_tags()
-    case_note2.extract_iocs()
+    case_note2.finalize_content()
     demo_case.notes.append(case_note2)
 
     # Create evidence 1: Compromised laptop
@@ -46,9 +42,7 @@ Review email headers and attachments for IOCs. #phishing #email-analysis""")
 Image hash verified: SHA256 e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855
 
 Chain of custody maintained throughout process. #forensics #imaging #chain-of-custody""")
-    note1.calculate_hash()
-    note1.extract_tags()
-    note1.extract_iocs()
+    note1.finalize_content()
     evidence1.notes.append(note1)
 
     note2 = Note(content="""Discovered suspicious connections to external IP addresses:
@@ -58,9 +52,7 @@ Chain of custody maintained throughout process. #forensics #imaging #chain-of-cu
 
 Browser history shows visits to malicious-site.com and data-exfil.net.
 #network-analysis #ioc #c2-server""")
-    note2.calculate_hash()
-    note2.extract_tags()
-    note2.extract_iocs()
+    note2.finalize_content()
     evidence1.notes.append(note2)
 
     note3 = Note(content="""Malware identified in temp directory:
@@ -70,9 +62,7 @@ SHA1: da39a3ee5e6b4b0d3255bfef95601890afd80709
 SHA256: e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855
 
 Submitting to VirusTotal for analysis. #malware #hash-analysis #virustotal""")
-    note3.calculate_hash()
-    note3.extract_tags()
-    note3.extract_iocs()
+    note3.finalize_content()
     evidence1.notes.append(note3)
 
     note4 = Note(content="""Timeline analysis reveals:
@@ -82,9 +72,7 @@ Submitting to VirusTotal for analysis. #malware #hash-analysis #virustotal""")
 - 2024-01-15 09:30:15 - Lateral movement detected
 
 User credentials compromised. Recommend immediate password reset. #timeline #lateral-movement""")
-    note4.calculate_hash()
-    note4.extract_tags()
-    note4.extract_iocs()
+    note4.finalize_content()
     evidence1.notes.append(note4)
 
     demo_case.evidence.append(evidence1)
@@ -103,9 +91,7 @@ User credentials compromised. Recommend immediate password reset. #timeline #lat
 
 Total data transferred: approximately 2.3 GB over 4 hours.
 #log-analysis #data-exfiltration #network-traffic""")
-    note5.calculate_hash()
-    note5.extract_tags()
-    note5.extract_iocs()
+    note5.finalize_content()
     evidence2.notes.append(note5)
 
     note6 = Note(content="""Contact information found in malware configuration:
@@ -113,9 +99,7 @@ Email: attacker@malicious-domain.com
 Backup C2: 2001:0db8:85a3:0000:0000:8a2e:0370:7334 (IPv6)
 
 Cross-referencing with threat intelligence databases. #threat-intel #attribution""")
-    note6.calculate_hash()
-    note6.extract_tags()
-    note6.extract_iocs()
+    note6.finalize_content()
     evidence2.notes.append(note6)
 
     demo_case.evidence.append(evidence2)
@@ -133,9 +117,7 @@ X-Originating-IP: 198.51.100.99
 
 Email contains embedded tracking pixel at http://tracking.malicious-site.com/pixel.gif
 Attachment: invoice.pdf.exe (double extension trick) #email-forensics #phishing-analysis""")
-    note7.calculate_hash()
-    note7.extract_tags()
-    note7.extract_iocs()
+    note7.finalize_content()
     evidence3.notes.append(note7)
 
     demo_case.evidence.append(evidence3)
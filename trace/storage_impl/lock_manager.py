@@ -1,81 +1,88 @@
 """File lock manager for preventing concurrent access"""
 
 import os
-import sys
 import time
 from pathlib import Path
 
+if os.name == 'nt':
+    import msvcrt
+
+    # msvcrt has no shared mode, so shared locks are taken exclusively there
+    def _lock_fd(fd, shared=False):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+    def _unlock_fd(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd, shared=False):
+        fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+
+    def _unlock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
 
 class LockManager:
-    """Cross-platform file lock manager to prevent concurrent access"""
+    """Cross-platform file lock manager to prevent concurrent access.
+
+    Uses the OS advisory lock on the lock file (flock on Unix, msvcrt.locking
+    on Windows) rather than the file's existence, so the kernel drops the lock
+    when the holder exits - even on a crash or SIGKILL - and no stale-PID
+    detection is needed. The holder's PID is still written for diagnostics.
+    """
 
     def __init__(self, lock_file: Path):
         self.lock_file = lock_file
         self.acquired = False
+        self._fd = None
 
-    def acquire(self, timeout: int = 5):
-        """Acquire lock with timeout. Returns True if successful."""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                # Try to create lock file exclusively (fails if exists)
-                # Use 'x' mode which fails if file exists (atomic on most systems)
-                fd = os.open(str(self.lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-                os.write(fd, str(os.getpid()).encode())
-                os.close(fd)
-                self.acquired = True
-                return True
-            except FileExistsError:
-                # Lock file exists, check if process is still alive
-                if self._is_stale_lock():
-                    # Remove stale lock and retry
-                    try:
-                        self.lock_file.unlink()
-                    except FileNotFoundError:
-                        pass
-                    continue
-                # Active lock, wait a bit
-                time.sleep(0.1)
-            except Exception:
-                # Other errors, wait and retry
-                time.sleep(0.1)
-        return False
-
-    def _is_stale_lock(self):
-        """Check if lock file is stale (process no longer exists)"""
-        try:
-            if not self.lock_file.exists():
-                return False
-            with open(self.lock_file, 'r') as f:
-                pid = int(f.read().strip())
+    def acquire(self, timeout: int = 5, shared: bool = False):
+        """Acquire lock with timeout. Returns True if successful.
 
-            # Check if process exists (cross-platform)
-            if sys.platform == 'win32':
-                import ctypes
-                kernel32 = ctypes.windll.kernel32
-                PROCESS_QUERY_INFORMATION = 0x0400
-                handle = kernel32.OpenProcess(PROCESS_QUERY_INFORMATION, 0, pid)
-                if handle:
-                    kernel32.CloseHandle(handle)
-                    return False
-                return True
-            else:
-                # Unix/Linux - send signal 0 to check if process exists
+        shared=True takes a lock that other shared holders can hold at the same
+        time but an exclusive one cannot (exclusive on Windows)."""
+        deadline = time.monotonic() + timeout
+        # Poll quickly at first so a lock released by a short-lived CLI call is
+        # picked up within a millisecond or two, backing off to 50ms for long waits
+        delay = 0.001
+        while time.monotonic() < deadline:
+            fd = None
+            try:
+                fd = os.open(str(self.lock_file), os.O_CREAT | os.O_RDWR, 0o600)
+                _lock_fd(fd, shared)
+            except OSError:
+                # Held by another process (or the file is unavailable), wait a bit
+                if fd is not None:
+                    os.close(fd)
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+                continue
+            if not shared:
                 try:
-                    os.kill(pid, 0)
-                    return False  # Process exists
+                    os.ftruncate(fd, 0)
+                    os.write(fd, str(os.getpid()).encode())
                 except OSError:
-                    return True  # Process doesn't exist
-        except (ValueError, FileNotFoundError, PermissionError):
+                    pass  # The PID is informational only
+            self._fd = fd
+            self.acquired = True
             return True
+        return False
 
     def release(self):
         """Release the lock"""
         if self.acquired:
             try:
-                self.lock_file.unlink()
-            except FileNotFoundError:
+                _unlock_fd(self._fd)
+            except OSError:
                 pass
+            # Closing the descriptor releases the lock in any case. The file is
+            # kept: unlinking it could let a waiter lock an orphaned inode while
+            # a third process creates and locks a new file at the same path
+            os.close(self._fd)
+            self._fd = None
             self.acquired = False
 
     def __enter__(self):
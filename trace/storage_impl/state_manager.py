@@ -1,8 +1,9 @@
 """State manager for active context and settings"""
 
 import json
+import os
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .storage import Storage
@@ -17,6 +18,8 @@ class StateManager:
         self.app_dir = app_dir
         self.state_file = self.app_dir / "state"
         self.settings_file = self.app_dir / "settings.json"
+        # path -> ((st_ino, st_mtime_ns, st_size), parsed dict) - see _read_json()
+        self._json_cache: Dict[Path, Tuple[tuple, dict]] = {}
         self._ensure_app_dir()
 
     def _ensure_app_dir(self):
@@ -27,20 +30,10 @@ class StateManager:
         state = self.get_active()
         state["case_id"] = case_id
         state["evidence_id"] = evidence_id
-        # Atomic write: write to temp file then rename
-        temp_file = self.state_file.with_suffix(".tmp")
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(state, f, ensure_ascii=False)
-        temp_file.replace(self.state_file)
+        self._write_json(self.state_file, state)
 
     def get_active(self) -> dict:
-        if not self.state_file.exists():
-            return {"case_id": None, "evidence_id": None}
-        try:
-            with open(self.state_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {"case_id": None, "evidence_id": None}
+        return self._read_json(self.state_file, {"case_id": None, "evidence_id": None})
 
     def validate_and_clear_stale(self, storage: 'Storage') -> str:
         """Validate active state against storage and clear stale references.
@@ -57,9 +50,10 @@ class StateManager:
                 self.set_active(None, None)
                 return warning
 
-            # Validate evidence if set
+            # Validate evidence if set; active evidence always belongs to the
+            # active case, so probe its index instead of every case's
             if evidence_id:
-                _, evidence = storage.find_evidence(evidence_id)
+                evidence = case.get_evidence(evidence_id)
                 if not evidence:
                     warning = f"Active evidence (ID: {evidence_id[:8]}...) no longer exists. Clearing to case level."
                     self.set_active(case_id, None)
@@ -74,19 +68,44 @@ class StateManager:
         return warning
 
     def get_settings(self) -> dict:
-        if not self.settings_file.exists():
-            return {"pgp_enabled": True}
-        try:
-            with open(self.settings_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {"pgp_enabled": True}
+        return self._read_json(self.settings_file, {"pgp_enabled": True})
 
     def set_setting(self, key: str, value):
         settings = self.get_settings()
         settings[key] = value
+        self._write_json(self.settings_file, settings)
+
+    def _read_json(self, path: Path, default: dict) -> dict:
+        """Return a copy of the JSON dict in path, or default if it is missing
+        or unreadable. The parsed dict is reused while the file's inode, mtime
+        and size are unchanged, so repeated reads cost a single stat(). The
+        inode matters: every write renames a new file into place, and the
+        state file nearly always has the same size, so two writes within
+        one mtime tick would otherwise look alike."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return default
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._json_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return default
+        self._json_cache[path] = (key, data)
+        return dict(data)
+
+    def _write_json(self, path: Path, data: dict):
+        # json.dumps encodes in one shot with the C encoder; json.dump streams
+        # chunks through the pure-Python iterencode
+        text = json.dumps(data, ensure_ascii=False)
         # Atomic write: write to temp file then rename
-        temp_file = self.settings_file.with_suffix(".tmp")
+        temp_file = path.with_suffix(".tmp")
         with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, ensure_ascii=False)
-        temp_file.replace(self.settings_file)
+            f.write(text)
+        temp_file.replace(path)
+        st = os.stat(path)
+        self._json_cache[path] = ((st.st_ino, st.st_mtime_ns, st.st_size), dict(data))
@@ -1,33 +1,69 @@
 """Main storage class for persisting cases, evidence, and notes"""
 
 import json
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from ..models import Case, Evidence
+from ..models import Note, Case, Evidence
 from .lock_manager import LockManager
 from .demo_data import create_demo_case
 
 DEFAULT_APP_DIR = Path.home() / ".trace"
 
+# Once the journal grows past this, the next journaled change rewrites data.json
+JOURNAL_COMPACT_SIZE = 4 * 1024 * 1024
+
 
 class Storage:
     """Manages persistence of all forensic data"""
 
-    def __init__(self, app_dir: Path = DEFAULT_APP_DIR, acquire_lock: bool = True):
+    def __init__(self, app_dir: Path = DEFAULT_APP_DIR, acquire_lock: bool = True, readonly: bool = False,
+                 load: bool = True):
+        """readonly=True is for commands that only read: the lock is then not
+        taken up front, so they don't queue behind (or block) a writer. If such
+        a storage does write after all, the lock is acquired first. Reads and
+        writes of data.json and the journal are serialized by io.lock instead
+        (see _io_lock()).
+        load=False starts without cases instead of reading data.json and the
+        journal (see empty())."""
         self.app_dir = app_dir
         self.data_file = self.app_dir / "data.json"
+        # Changes since data.json was last written, one JSON record per line
+        self.journal_file = self.app_dir / "notes.jsonl"
         self.lock_file = self.app_dir / "app.lock"
+        # Held briefly around each read or write of data.json and the journal
+        self.io_lock_file = self.app_dir / "io.lock"
         self.lock_manager = None
+        # (cases list, its length, by-id dict, by-number dict) - see _case_indexes()
+        self._case_index_cache = None
+        # save_data() only marks the data dirty while a deferred_save() block is open
+        self._save_depth = 0
+        self._dirty = False
         self._ensure_app_dir()
 
         # Acquire lock to prevent concurrent access
-        if acquire_lock:
-            self.lock_manager = LockManager(self.lock_file)
-            if not self.lock_manager.acquire(timeout=5):
-                raise RuntimeError("Another instance of trace is already running. Please close it first.")
+        self._lock_pending = acquire_lock and readonly
+        if acquire_lock and not readonly:
+            self._acquire_lock()
+
+        if not load:
+            self.cases: List[Case] = []
+            return
 
-        self.cases: List[Case] = self._load_data()
+        # data.json and the journal must come from the same moment: a writer
+        # compacting between the two reads would leave journaled changes out
+        try:
+            with self._io_lock(shared=True):
+                self.cases = self._load_data()
+                self._replay_journal()
+        except Exception:
+            # The traceback keeps this half-built Storage (and so its lock)
+            # alive, which would lock out recovery through Storage.empty()
+            if self.lock_manager:
+                self.lock_manager.release()
+            raise
 
         # Create demo case on first launch (only if data loaded successfully and is empty)
         if not self.cases and self.data_file.exists():
@@ -39,11 +75,41 @@ class Storage:
             self.cases.append(demo_case)
             self.save_data()
 
+    @classmethod
+    def empty(cls, app_dir: Path = DEFAULT_APP_DIR) -> 'Storage':
+        """Locked Storage with no cases that never reads data.json or the
+        journal, for starting over when they are corrupted."""
+        return cls(app_dir, load=False)
+
     def __del__(self):
         """Release lock when Storage object is destroyed"""
         if self.lock_manager:
             self.lock_manager.release()
 
+    def _acquire_lock(self):
+        self.lock_manager = LockManager(self.lock_file)
+        if not self.lock_manager.acquire(timeout=5):
+            raise RuntimeError("Another instance of trace is already running. Please close it first.")
+
+    @contextmanager
+    def _io_lock(self, shared: bool):
+        """Hold io.lock while reading (shared) or writing (exclusive) data.json
+        and the journal. app.lock alone only keeps writers apart, and readers
+        without it would otherwise see half of a compaction."""
+        lock = LockManager(self.io_lock_file)
+        if not lock.acquire(timeout=5, shared=shared):
+            raise RuntimeError("Timed out waiting for another instance of trace to finish writing.")
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def _lock_for_write(self):
+        """Take the lock deferred by readonly=True before the first write."""
+        if self._lock_pending:
+            self._acquire_lock()
+            self._lock_pending = False
+
     def _ensure_app_dir(self):
         if not self.app_dir.exists():
             self.app_dir.mkdir(parents=True, exist_ok=True)
@@ -54,7 +120,7 @@ class Storage:
         try:
             with open(self.data_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                return [Case.from_dict(c) for c in data]
+            return [Case.from_dict(c) for c in data]
         except (json.JSONDecodeError, IOError, KeyError, ValueError) as e:
             # Corrupted JSON - create backup and raise exception
             import shutil
@@ -68,6 +134,75 @@ class Storage:
             # Raise exception with information about backup
             raise RuntimeError(f"Data file is corrupted. Backup saved to: {backup_file}\nError: {e}")
 
+    def _replay_journal(self):
+        """Apply the changes journaled by append_note(), delete_note(), add_case(),
+        add_evidence(), delete_case() and delete_evidence() on top of the loaded
+        data, in order."""
+        try:
+            try:
+                with open(self.journal_file, 'rb') as f:
+                    records = f.read().split(b'\n')
+            except FileNotFoundError:
+                return  # No changes since data.json was written
+            # The last element is empty unless an append was interrupted mid-line;
+            # such a torn record was never completed, so it is dropped
+            records.pop()
+
+            # A crash between rewriting data.json and removing the journal leaves
+            # changes in both, so every record is applied idempotently
+            known = {n.note_id for c in self.cases for n in c.notes}
+            known.update(n.note_id for c in self.cases for e in c.evidence for n in e.notes)
+
+            for line in records:
+                if not line:
+                    continue
+                record = json.loads(line)
+                op = record.get("op", "add_note")
+                if op == "add_case":
+                    case = Case.from_dict(record["case"])
+                    if self.get_case(case.case_id) is None:
+                        self.cases.append(case)
+                    continue
+                if op == "delete_case":
+                    self.cases = [c for c in self.cases if c.case_id != record["case_id"]]
+                    continue
+
+                case = self.get_case(record["case_id"])
+                if case is None:
+                    continue  # Case was deleted after the change was journaled
+                if op == "add_evidence":
+                    evidence = Evidence.from_dict(record["evidence"])
+                    if case.get_evidence(evidence.evidence_id) is None:
+                        case.evidence.append(evidence)
+                elif op == "delete_evidence":
+                    case.evidence = [e for e in case.evidence if e.evidence_id != record["evidence_id"]]
+                elif op in ("add_note", "delete_note"):
+                    target = case
+                    if record["evidence_id"]:
+                        target = case.get_evidence(record["evidence_id"])
+                        if target is None:
+                            continue
+                    if op == "delete_note":
+                        target.notes = [n for n in target.notes if n.note_id != record["note_id"]]
+                        continue
+                    note = Note.from_dict(record["note"])
+                    if note.note_id not in known:
+                        known.add(note.note_id)
+                        target.notes.append(note)
+                else:
+                    raise ValueError(f"Unknown journal operation: {op}")
+        except (json.JSONDecodeError, IOError, KeyError, ValueError) as e:
+            # Corrupted journal - create backup and raise exception
+            import shutil
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_file = self.app_dir / f"notes.jsonl.corrupted.{timestamp}"
+            try:
+                shutil.copy2(self.journal_file, backup_file)
+            except Exception:
+                pass
+            raise RuntimeError(f"Note journal is corrupted. Backup saved to: {backup_file}\nError: {e}")
+
     def start_fresh(self):
         """Start with fresh data (for corrupted JSON recovery)"""
         self.cases = []
@@ -76,37 +211,159 @@ class Storage:
         self.save_data()
 
     def save_data(self):
-        data = [c.to_dict() for c in self.cases]
+        if self._save_depth:
+            self._dirty = True
+            return
+        self._write_data()
+
+    @contextmanager
+    def deferred_save(self):
+        """Coalesce saves: save_data() calls inside the block are written once
+        when the outermost block exits (also on error, so no mutation is lost)."""
+        self._save_depth += 1
+        try:
+            yield self
+        finally:
+            self._save_depth -= 1
+            if not self._save_depth:
+                self.flush()
+
+    def flush(self):
+        """Write pending changes from a deferred_save() block now."""
+        if self._dirty:
+            self._dirty = False
+            self._write_data()
+
+    def _write_data(self):
+        # One case per line: without indent= json uses its C encoder, which is
+        # several times faster than the pure-Python indenting one
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        text = ",\n".join([encode(c.to_dict()) for c in self.cases])
+        self._lock_for_write()
         # Write to temp file then rename for atomic-ish write
         temp_file = self.data_file.with_suffix(".tmp")
         with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        temp_file.replace(self.data_file)
+            f.write(f"[\n{text}\n]\n" if text else "[]\n")
+            # The new contents must be on disk before the rename can expose them
+            f.flush()
+            os.fsync(f.fileno())
+        # Readers must see either the old data.json with its journal or the new
+        # one without, never the new data.json next to the old journal's absence
+        with self._io_lock(shared=False):
+            temp_file.replace(self.data_file)
+            self._fsync_app_dir()
+            # data.json now holds every journaled change
+            self.journal_file.unlink(missing_ok=True)
+
+    def _fsync_app_dir(self):
+        """Make the data.json rename durable before the journal is dropped.
+        Only POSIX can open a directory for fsync; elsewhere this is a no-op."""
+        if os.name != 'posix':
+            return
+        fd = os.open(self.app_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _journal(self, record: dict):
+        """Persist one change by appending it to the journal instead of rewriting
+        data.json; the journal is folded into data.json once it gets large."""
+        if self._save_depth and self._dirty:
+            return  # A full write is already pending and will include the change
+
+        data = memoryview((json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8'))
+        self._lock_for_write()
+        with self._io_lock(shared=False):
+            fd = os.open(self.journal_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0), 0o600)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+                os.fsync(fd)
+                journal_size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+
+        if journal_size > JOURNAL_COMPACT_SIZE:
+            self.save_data()
+
+    def append_note(self, case: Case, evidence: Optional[Evidence], note: Note):
+        """Add a note to evidence (or to the case if evidence is None) and persist
+        it by appending one record to the journal instead of rewriting data.json."""
+        (evidence if evidence is not None else case).notes.append(note)
+        self._journal({
+            "op": "add_note",
+            "case_id": case.case_id,
+            "evidence_id": evidence.evidence_id if evidence is not None else None,
+            "note": note.to_dict(),
+        })
+
+    def delete_note(self, note_id: str) -> bool:
+        """Remove a note from whichever case or evidence holds it and journal the
+        removal. Returns False if no note has that ID."""
+        for case in self.cases:
+            for holder in (case, *case.evidence):
+                for i, note in enumerate(holder.notes):
+                    if note.note_id == note_id:
+                        del holder.notes[i]
+                        self._journal({
+                            "op": "delete_note",
+                            "case_id": case.case_id,
+                            "evidence_id": holder.evidence_id if holder is not case else None,
+                            "note_id": note_id,
+                        })
+                        return True
+        return False
+
+    def _case_indexes(self) -> Tuple[Dict[str, Case], Dict[str, Case]]:
+        """Return the (case_id -> Case, case_number -> Case) indexes, rebuilding
+        them if self.cases was replaced or changed length since they were built.
+        For duplicate case numbers the first case in list order wins."""
+        cache = self._case_index_cache
+        if cache is None or cache[0] is not self.cases or cache[1] != len(self.cases):
+            by_id = {}
+            by_number = {}
+            for c in self.cases:
+                by_id[c.case_id] = c
+                by_number.setdefault(c.case_number, c)
+            cache = (self.cases, len(self.cases), by_id, by_number)
+            self._case_index_cache = cache
+        return cache[2], cache[3]
 
     def add_case(self, case: Case):
+        by_id, by_number = self._case_indexes()
         self.cases.append(case)
-        self.save_data()
+        by_id[case.case_id] = case
+        by_number.setdefault(case.case_number, case)
+        self._case_index_cache = (self.cases, len(self.cases), by_id, by_number)
+        self._journal({"op": "add_case", "case": case.to_dict()})
 
     def get_case(self, case_id: str) -> Optional[Case]:
-        # Case ID lookup
-        for c in self.cases:
-            if c.case_id == case_id:
-                return c
-        return None
+        return self._case_indexes()[0].get(case_id)
+
+    def get_case_by_number(self, case_number: str) -> Optional[Case]:
+        return self._case_indexes()[1].get(case_number)
 
     def delete_case(self, case_id: str):
         self.cases = [c for c in self.cases if c.case_id != case_id]
-        self.save_data()
+        self._journal({"op": "delete_case", "case_id": case_id})
+
+    def add_evidence(self, case: Case, evidence: Evidence):
+        case.evidence.append(evidence)
+        self._journal({"op": "add_evidence", "case_id": case.case_id, "evidence": evidence.to_dict()})
 
     def delete_evidence(self, case_id: str, evidence_id: str):
         case = self.get_case(case_id)
         if case:
             case.evidence = [e for e in case.evidence if e.evidence_id != evidence_id]
-            self.save_data()
+            self._journal({"op": "delete_evidence", "case_id": case_id, "evidence_id": evidence_id})
 
     def find_evidence(self, evidence_id: str) -> Tuple[Optional[Case], Optional[Evidence]]:
+        # One dict probe per case via Case's lazily maintained evidence index;
+        # evidence lists are also mutated outside Storage, so a storage-wide
+        # index could go stale where the per-case one revalidates itself
         for c in self.cases:
-            for e in c.evidence:
-                if e.evidence_id == evidence_id:
-                    return c, e
+            e = c.get_evidence(evidence_id)
+            if e is not None:
+                return c, e
         return None, None
@@ -1,9 +1,18 @@
 import unittest
+from unittest import mock
+import contextlib
+import io
+import json
+import os
 import shutil
+import sys
 import tempfile
+import threading
+import time
 from pathlib import Path
 from trace.models import Note, Case, Evidence
-from trace.storage import Storage, StateManager
+from trace.storage import Storage, StateManager, LockManager
+from trace.cli import quick_add_note, export_markdown, format_note_for_export
 
 class TestModels(unittest.TestCase):
     def test_note_hash(self):
@@ -11,6 +20,79 @@ class TestModels(unittest.TestCase):
         note.calculate_hash()
         self.assertTrue(note.content_hash)
 
+    def test_bulk_verify(self):
+        from trace.crypto import Crypto
+        notes = [Note(content="first"), Note(content="second")]
+        for note in notes:
+            note.calculate_hash()
+        self.assertEqual(Crypto.bulk_verify(notes), [])
+
+        notes[1].content = "tampered"
+        self.assertEqual(Crypto.bulk_verify(notes), [notes[1]])
+
+    def test_note_dict_roundtrip(self):
+        note = Note(content="Seen 10.0.0.1 #lateral", signature="sig")
+        note.finalize_content()
+        self.assertEqual(Note.from_dict(note.to_dict()), note)
+
+    def test_note_extract_all(self):
+        note = Note(content="Beacon to 203.0.113.45 and https://evil.com/a#stage2 #C2 #c2 from ops@evil.com")
+        note.extract_all()
+        self.assertEqual(note.tags, ["stage2", "c2"])
+        self.assertEqual(note.iocs, ["203.0.113.45", "https://evil.com/a#stage2", "ops@evil.com"])
+
+    def test_ioc_extraction_regressions(self):
+        from trace.models.extractors.ioc_extractor import IOCExtractor
+        cases = {
+            # The URL is one IOC; the IPv4 inside it is not reported separately
+            "https://1.2.3.4/x": [("https://1.2.3.4/x", 0, 17, "url")],
+            # An email is reported whole, not as its domain
+            "user@evil.com": [("user@evil.com", 0, 13, "email")],
+            # Results come in text order, not grouped by type; the IPv6
+            # pattern only picks up the '::1' tail of 'fe80::1'
+            "fe80::1 1.2.3.4": [("::1", 4, 7, "ipv6"), ("1.2.3.4", 8, 15, "ipv4")],
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(IOCExtractor.extract_iocs_with_positions(text), expected)
+                self.assertEqual(IOCExtractor.extract_iocs_with_types(text),
+                                 [(ioc, kind) for ioc, _, _, kind in expected])
+                note = Note(content=text)
+                note.extract_all()
+                self.assertEqual(note.iocs, [ioc for ioc, _, _, _ in expected])
+
+    def test_ioc_extraction_skips_regex_without_ioc_characters(self):
+        from trace.models.extractors import ioc_extractor
+        text = "no indicators in here"  # No '.' or ':' and shorter than a hash
+        with mock.patch.object(ioc_extractor, "_ioc_regex_for") as regex_for:
+            self.assertEqual(ioc_extractor.IOCExtractor.extract_iocs(text), [])
+            self.assertEqual(ioc_extractor.IOCExtractor.extract_iocs_with_positions(text), [])
+        regex_for.assert_not_called()
+        note = Note(content=text)
+        note.extract_all()
+        self.assertEqual(note.iocs, [])
+
+    def test_note_extract_highlights(self):
+        line = "#c2 at 203.0.113.45 via https://evil.com/a#x"
+        self.assertEqual(Note.extract_highlights(line), (
+            ("#c2", 0, 3, "tag"),
+            ("203.0.113.45", 7, 19, "ioc"),
+            ("https://evil.com/a#x", 24, 44, "ioc"),
+        ))
+        # Redraws of the same line reuse the cached result
+        self.assertIs(Note.extract_highlights(line), Note.extract_highlights(line))
+
+    def test_note_extract_highlights_ioc_inside_tag(self):
+        # The domain stored as an IOC is highlighted whole instead of the tag
+        line = "see #abc.def.com and #ok"
+        note = Note(content=line)
+        note.extract_all()
+        self.assertEqual(note.iocs, ["abc.def.com"])
+        self.assertEqual(Note.extract_highlights(line), (
+            ("abc.def.com", 5, 16, "ioc"),
+            ("#ok", 21, 24, "tag"),
+        ))
+
     def test_case_dict(self):
         c = Case(case_number="123", name="Test")
         d = c.to_dict()
@@ -18,6 +100,20 @@ class TestModels(unittest.TestCase):
         c2 = Case.from_dict(d)
         self.assertEqual(c2.name, "Test")
 
+    def test_case_get_evidence(self):
+        c = Case(case_number="123")
+        ev1 = Evidence(name="Disk")
+        c.evidence.append(ev1)
+        self.assertIs(c.get_evidence(ev1.evidence_id), ev1)
+        self.assertIs(c.get_evidence_by_name("Disk"), ev1)
+
+        # Index follows appends and list replacement
+        ev2 = Evidence(name="Memory")
+        c.evidence.append(ev2)
+        self.assertIs(c.get_evidence(ev2.evidence_id), ev2)
+        c.evidence = [e for e in c.evidence if e is not ev1]
+        self.assertIsNone(c.get_evidence(ev1.evidence_id))
+
 class TestStorage(unittest.TestCase):
     def setUp(self):
         self.test_dir = Path(tempfile.mkdtemp())
@@ -38,6 +134,64 @@ class TestStorage(unittest.TestCase):
         self.assertIsNotNone(loaded_case)
         self.assertEqual(loaded_case.name, "Test Case")
 
+    def test_get_case_after_delete(self):
+        case = Case(case_number="T-003")
+        self.storage.add_case(case)
+        self.assertIs(self.storage.get_case(case.case_id), case)
+        self.assertIs(self.storage.get_case_by_number("T-003"), case)
+
+        self.storage.delete_case(case.case_id)
+        self.assertIsNone(self.storage.get_case(case.case_id))
+
+    def test_deferred_save(self):
+        case = Case(case_number="T-004")
+        self.storage.add_case(case)
+        with self.storage.deferred_save():
+            case.name = "Renamed"
+            self.storage.save_data()
+            reloaded = Storage(app_dir=self.test_dir, acquire_lock=False)
+            self.assertEqual(reloaded.get_case(case.case_id).name, "")
+
+        reloaded = Storage(app_dir=self.test_dir, acquire_lock=False)
+        self.assertEqual(reloaded.get_case(case.case_id).name, "Renamed")
+
+    def test_append_note_journal(self):
+        case = Case(case_number="T-005")
+        ev = Evidence(name="Disk")
+        case.evidence.append(ev)
+        self.storage.add_case(case)
+        self.storage.append_note(case, ev, Note(content="journaled"))
+        self.assertTrue(self.storage.journal_file.exists())
+
+        reloaded = Storage(app_dir=self.test_dir, acquire_lock=False)
+        self.assertEqual([n.content for n in reloaded.get_case(case.case_id).evidence[0].notes], ["journaled"])
+
+        # A full save folds the journal into data.json
+        reloaded.save_data()
+        self.assertFalse(reloaded.journal_file.exists())
+        reloaded = Storage(app_dir=self.test_dir, acquire_lock=False)
+        self.assertEqual(len(reloaded.get_case(case.case_id).evidence[0].notes), 1)
+
+    def test_journal_replays_case_changes(self):
+        kept = Case(case_number="T-006")
+        dropped = Case(case_number="T-007")
+        self.storage.add_case(kept)
+        self.storage.add_case(dropped)
+        self.storage.add_evidence(kept, Evidence(name="Phone"))
+        ev = Evidence(name="Laptop")
+        self.storage.add_evidence(kept, ev)
+        self.storage.delete_evidence(kept.case_id, ev.evidence_id)
+        self.storage.delete_case(dropped.case_id)
+        note = Note(content="retracted")
+        self.storage.append_note(kept, None, note)
+        self.assertTrue(self.storage.delete_note(note.note_id))
+        self.assertFalse(self.storage.delete_note(note.note_id))
+
+        reloaded = Storage(app_dir=self.test_dir, acquire_lock=False)
+        self.assertIsNone(reloaded.get_case(dropped.case_id))
+        self.assertEqual([e.name for e in reloaded.get_case(kept.case_id).evidence], ["Phone"])
+        self.assertEqual(reloaded.get_case(kept.case_id).notes, [])
+
     def test_find_evidence(self):
         case = Case(case_number="T-002")
         ev = Evidence(name="Gun")
@@ -48,6 +202,130 @@ class TestStorage(unittest.TestCase):
         self.assertEqual(c.case_id, case.case_id)
         self.assertEqual(e.name, "Gun")
 
+class TestCrypto(unittest.TestCase):
+    def test_sign_many(self):
+        from trace.crypto import Crypto
+
+        def fake_sign(content, key_id=None):
+            if content == "boom":
+                raise OSError("gpg died")
+            return "" if content == "nokey" else f"signed:{content}:{key_id}"
+
+        with mock.patch.object(Crypto, "sign_content", side_effect=fake_sign) as sign:
+            results = Crypto.sign_many(["a", "", "boom", "nokey", "b"], key_id="K", max_parallel=3)
+        self.assertEqual(results, ["signed:a:K", "", "", "", "signed:b:K"])
+        # Empty content never reaches gpg
+        self.assertNotIn(mock.call("", key_id="K"), sign.call_args_list)
+
+class TestCorruptedDataRecovery(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        (self.test_dir / "data.json").write_text("{not json", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_start_fresh_after_failed_load(self):
+        # Like the TUI, keep the error (and so its traceback frames holding the
+        # half-built Storage) alive while starting fresh
+        try:
+            Storage(app_dir=self.test_dir)
+        except RuntimeError as e:
+            failed = e
+        self.assertIn("corrupted", str(failed))
+
+        storage = Storage.empty(self.test_dir)
+        self.assertTrue(storage.lock_manager.acquired)
+        storage.start_fresh()
+        self.assertEqual(len(storage.cases), 1)
+        self.assertTrue(list(self.test_dir.glob("data.json.corrupted.*")))
+        storage.lock_manager.release()
+
+        self.assertEqual(len(Storage(app_dir=self.test_dir, acquire_lock=False).cases), 1)
+
+class TestLockManager(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.lock_file = self.test_dir / "app.lock"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_exclusive_locks_exclude_each_other(self):
+        first = LockManager(self.lock_file)
+        self.assertTrue(first.acquire(timeout=1))
+        self.assertFalse(LockManager(self.lock_file).acquire(timeout=0.05))
+        first.release()
+
+    @unittest.skipIf(sys.platform == 'win32', "msvcrt locks have no shared mode")
+    def test_shared_locks_coexist(self):
+        first, second = LockManager(self.lock_file), LockManager(self.lock_file)
+        self.assertTrue(first.acquire(timeout=1, shared=True))
+        self.assertTrue(second.acquire(timeout=1, shared=True))
+        first.release()
+        second.release()
+
+    def test_shared_and_exclusive_exclude_each_other(self):
+        shared = LockManager(self.lock_file)
+        self.assertTrue(shared.acquire(timeout=1, shared=True))
+        self.assertFalse(LockManager(self.lock_file).acquire(timeout=0.05))
+        shared.release()
+
+        exclusive = LockManager(self.lock_file)
+        self.assertTrue(exclusive.acquire(timeout=1))
+        self.assertFalse(LockManager(self.lock_file).acquire(timeout=0.05, shared=True))
+        exclusive.release()
+
+    def test_reacquire_after_release(self):
+        lock = LockManager(self.lock_file)
+        self.assertTrue(lock.acquire(timeout=1))
+        lock.release()
+        self.assertFalse(lock.acquired)
+        # The file stays; only the OS lock on it is dropped
+        self.assertTrue(self.lock_file.exists())
+        other = LockManager(self.lock_file)
+        self.assertTrue(other.acquire(timeout=1))
+        other.release()
+
+class TestStorageLocking(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        Storage(app_dir=self.test_dir, acquire_lock=False)  # Writes the demo case
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_readonly_defers_writer_lock(self):
+        storage = Storage(app_dir=self.test_dir, readonly=True)
+        self.assertIsNone(storage.lock_manager)
+        writer = LockManager(self.test_dir / "app.lock")
+        self.assertTrue(writer.acquire(timeout=1))
+        writer.release()
+
+        storage.add_case(Case(case_number="RO-001"))
+        self.assertTrue(storage.lock_manager.acquired)
+        self.assertFalse(LockManager(self.test_dir / "app.lock").acquire(timeout=0.05))
+        storage.lock_manager.release()
+
+    def test_load_waits_for_exclusive_io_lock(self):
+        io_lock = LockManager(self.test_dir / "io.lock")
+        self.assertTrue(io_lock.acquire(timeout=1))
+
+        def replace_data_then_release():
+            # Stands in for a writer mid-compaction: the load must not start
+            # until the new data.json is in place
+            time.sleep(0.2)
+            temp_file = self.test_dir / "data.tmp"
+            temp_file.write_text(json.dumps([Case(case_number="W-001").to_dict()]), encoding="utf-8")
+            temp_file.replace(self.test_dir / "data.json")
+            io_lock.release()
+
+        writer = threading.Thread(target=replace_data_then_release)
+        writer.start()
+        reader = Storage(app_dir=self.test_dir, readonly=True)
+        writer.join()
+        self.assertEqual([c.case_number for c in reader.cases], ["W-001"])
+
 class TestStateManager(unittest.TestCase):
     def setUp(self):
         self.test_dir = Path(tempfile.mkdtemp())
@@ -62,5 +340,84 @@ class TestStateManager(unittest.TestCase):
         self.assertEqual(state["case_id"], "123")
         self.assertEqual(state["evidence_id"], "456")
 
+    def test_get_active_sees_other_writers(self):
+        self.mgr.set_active(case_id="a" * 36, evidence_id="b" * 36)
+        self.assertEqual(self.mgr.get_active()["case_id"], "a" * 36)  # Now cached
+
+        # Another process rewrites the state within the same mtime tick and
+        # with the same size; only the new inode gives the change away
+        state_file = self.test_dir / "state"
+        old = state_file.stat()
+        StateManager(app_dir=self.test_dir).set_active(case_id="c" * 36, evidence_id="d" * 36)
+        os.utime(state_file, ns=(old.st_atime_ns, old.st_mtime_ns))
+        self.assertEqual(state_file.stat().st_size, old.st_size)
+
+        self.assertEqual(self.mgr.get_active(), {"case_id": "c" * 36, "evidence_id": "d" * 36})
+
+class TestQuickAddNote(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.storage = Storage(app_dir=self.test_dir, acquire_lock=False)
+        self.mgr = StateManager(app_dir=self.test_dir)
+        self.mgr.set_setting("pgp_enabled", False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_quick_add_note_uses_given_instances(self):
+        case = Case(case_number="Q-001")
+        self.storage.add_case(case)
+        self.mgr.set_active(case.case_id, None)
+
+        quick_add_note("Seen #beacon to 198.51.100.7", storage=self.storage, state_manager=self.mgr)
+
+        self.assertEqual(case.notes[0].tags, ["beacon"])
+        reloaded = Storage(app_dir=self.test_dir, acquire_lock=False)
+        self.assertEqual(reloaded.get_case(case.case_id).notes[0].iocs, ["198.51.100.7"])
+
+class TestExportMarkdown(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.storage = Storage(app_dir=self.test_dir, acquire_lock=False, load=False)
+        self.mgr = StateManager(app_dir=self.test_dir)
+        self.mgr.set_setting("pgp_enabled", False)
+        self.output = self.test_dir / "export.md"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _export(self):
+        with mock.patch("trace.cli._export_header", return_value="# Header\n\n"), \
+                contextlib.redirect_stdout(io.StringIO()):
+            export_markdown(str(self.output), storage=self.storage, state_manager=self.mgr)
+        return self.output.read_text(encoding="utf-8")
+
+    def test_export_twice_to_same_path(self):
+        case = Case(case_number="EXP-001")
+        evidence = Evidence(name="Disk")
+        case.evidence.append(evidence)
+        self.storage.cases.append(case)
+        notes = [Note(content="Beacon to 203.0.113.45 #c2"), Note(content="Second\nline"),
+                 Note(content="On disk: d41d8cd98f00b204e9800998ecf8427e")]
+        for note in notes:
+            note.finalize_content()
+        case.notes.extend(notes[:2])
+        evidence.notes.append(notes[2])
+
+        def expected():
+            return ("# Header\n\n"
+                    f"## Case: EXP-001\n**Case ID:** {case.case_id}\n\n### Case Notes\n"
+                    + "".join(format_note_for_export(n) for n in case.notes)
+                    + f"\n### Evidence\n#### Evidence: Disk\n**ID:** {evidence.evidence_id}\n\n"
+                    + "##### Evidence Notes\n" + format_note_for_export(notes[2]) + "\n---\n\n")
+
+        self.assertEqual(self._export(), expected())
+        if os.name == 'posix':
+            self.assertEqual(self.output.stat().st_mode & 0o777, 0o600)
+
+        # A shorter second export must replace the file, not append to it
+        del case.notes[1]
+        self.assertEqual(self._export(), expected())
+
 if __name__ == '__main__':
     unittest.main()
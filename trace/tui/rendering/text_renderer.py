@@ -1,7 +1,6 @@
 """Text rendering utilities with highlighting support"""
 
 import curses
-import re
 from ...models import Note
 from .colors import ColorPairs
 
@@ -54,26 +53,8 @@ class TextRenderer:
         - Selection background is ColorPairs.SELECTION (cyan) for non-IOC text
         - IOC highlighting takes priority over selection
         """
-        # Extract IOCs and tags
-        highlights = []
-
-        # Get IOCs with positions
-        for text, start, end, ioc_type in Note.extract_iocs_with_positions(line):
-            highlights.append((text, start, end, 'ioc'))
-
-        # Get tags
-        for match in re.finditer(r'#\w+', line):
-            highlights.append((match.group(), match.start(), match.end(), 'tag'))
-
-        # Sort by position and remove overlaps (IOCs take priority over tags)
-        highlights.sort(key=lambda x: x[1])
-        deduplicated = []
-        last_end = -1
-        for text, start, end, htype in highlights:
-            if start >= last_end:
-                deduplicated.append((text, start, end, htype))
-                last_end = end
-        highlights = deduplicated
+        # Extract IOCs and tags in one pass (sorted, non-overlapping)
+        highlights = Note.extract_highlights(line)
 
         if not highlights:
             # No highlights - use selection color if selected
@@ -1,5 +1,6 @@
 import curses
 import time
+from functools import lru_cache
 from typing import Optional, List
 from .models import Case, Evidence, Note
 from .storage import Storage, StateManager
@@ -254,8 +255,10 @@ class TUI:
         # Return list of (ioc, count, type) tuples
         return [(ioc, count, ioc_type) for ioc, (count, ioc_type) in sorted_iocs]
 
-    def _classify_ioc(self, ioc):
-        """Classify IOC type based on pattern"""
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _classify_ioc(ioc):
+        """Classify IOC type based on pattern (memoized across IOC list refreshes)"""
         import re
         # Check longest hashes first to avoid misclassification
         if re.match(r'^[a-fA-F0-9]{64}$', ioc):
@@ -454,32 +457,13 @@ class TUI:
         - Selection background is ColorPairs.SELECTION (cyan) for non-IOC text
         - IOC highlighting takes priority over selection
         """
-        import re
         from .models import Note
         
         # Use provided window or default to main screen
         screen = win if win is not None else self.stdscr
         
-        # Extract IOCs and tags
-        highlights = []
-        
-        # Get IOCs with positions
-        for text, start, end, ioc_type in Note.extract_iocs_with_positions(line):
-            highlights.append((text, start, end, 'ioc'))
-        
-        # Get tags
-        for match in re.finditer(r'#\w+', line):
-            highlights.append((match.group(), match.start(), match.end(), 'tag'))
-        
-        # Sort by position and remove overlaps (IOCs take priority over tags)
-        highlights.sort(key=lambda x: x[1])
-        deduplicated = []
-        last_end = -1
-        for text, start, end, htype in highlights:
-            if start >= last_end:
-                deduplicated.append((text, start, end, htype))
-                last_end = end
-        highlights = deduplicated
+        # Extract IOCs and tags in one pass (sorted, non-overlapping)
+        highlights = Note.extract_highlights(line)
         
         if not highlights:
             # No highlights - use selection color if selected
@@ -2483,6 +2467,8 @@ class TUI:
         available_keys = Crypto.list_gpg_keys()
 
         if not available_keys:
+            # Re-list next time in case the user creates a key meanwhile
+            Crypto.clear_cache()
             # Show error message
             self._show_error_dialog("No GPG Keys Found",
                                    "No GPG secret keys found on this system.\n"
@@ -2632,8 +2618,7 @@ class TUI:
         ev = Evidence(name=name, description=desc or "")
         if source_hash:
             ev.metadata["source_hash"] = source_hash
-        self.active_case.evidence.append(ev)
-        self.storage.save_data()
+        self.storage.add_evidence(self.active_case, ev)
         self.show_message(f"Evidence '{name}' added.")
 
     def dialog_add_note(self):
@@ -2698,9 +2683,7 @@ class TUI:
         gpg_key_id = settings.get("gpg_key_id", None)
 
         note = Note(content=content)
-        note.calculate_hash()
-        note.extract_tags()  # Extract hashtags from content
-        note.extract_iocs()  # Extract IOCs from content
+        note.finalize_content()  # Hash plus hashtags and IOCs from content
 
         signed = False
         if pgp_enabled:
@@ -2713,16 +2696,20 @@ class TUI:
                 self.show_message("Note Saved. GPG Signing Failed!")
 
         # Add note to the appropriate target
-        if target_evidence:
+        if not target_evidence and not target_case:
+            if self.current_view == "evidence_detail" and self.active_evidence:
+                target_evidence = self.active_evidence
+            elif self.current_view == "case_detail" and self.active_case:
+                target_case = self.active_case
+        if target_evidence and not target_case:
+            target_case, _ = self.storage.find_evidence(target_evidence.evidence_id)
+
+        if target_case:
+            # Journaled as a single record instead of rewriting all data
+            self.storage.append_note(target_case, target_evidence, note)
+        elif target_evidence:
             target_evidence.notes.append(note)
-        elif target_case:
-            target_case.notes.append(note)
-        elif self.current_view == "evidence_detail" and self.active_evidence:
-            self.active_evidence.notes.append(note)
-        elif self.current_view == "case_detail" and self.active_case:
-            self.active_case.notes.append(note)
-
-        self.storage.save_data()
+            self.storage.save_data()
         if not (pgp_enabled and not signed):
             self.show_message("Note added successfully.")
 
@@ -2774,8 +2761,7 @@ class TUI:
                 note_to_del = case_notes[note_idx]
                 preview = note_to_del.content[:50] + "..." if len(note_to_del.content) > 50 else note_to_del.content
                 if self.dialog_confirm(f"Delete note: '{preview}'?"):
-                    self.active_case.notes.remove(note_to_del)
-                    self.storage.save_data()
+                    self.storage.delete_note(note_to_del.note_id)
                     self.selected_index = 0
                     self.scroll_offset = 0
                     self.show_message("Note deleted.")
@@ -2794,8 +2780,7 @@ class TUI:
                 # Show preview of note content in confirmation
                 preview = note_to_del.content[:50] + "..." if len(note_to_del.content) > 50 else note_to_del.content
                 if self.dialog_confirm(f"Delete note: '{preview}'?"):
-                    self.active_evidence.notes.remove(note_to_del)
-                    self.storage.save_data()
+                    self.storage.delete_note(note_to_del.note_id)
                     # Adjust selected index if needed
                     if self.selected_index >= len(notes) - 1:
                         self.selected_index = max(0, len(notes) - 2)
@@ -2810,30 +2795,9 @@ class TUI:
             preview = self.current_note.content[:50] + "..." if len(self.current_note.content) > 50 else self.current_note.content
             if self.dialog_confirm(f"Delete note: '{preview}'?"):
                 # Find and delete the note from its parent (case or evidence) using note_id
-                deleted = False
-                note_id = self.current_note.note_id
-                # Check all cases and their evidence for this note
-                for case in self.cases:
-                    for note in case.notes:
-                        if note.note_id == note_id:
-                            case.notes.remove(note)
-                            deleted = True
-                            break
-                    if deleted:
-                        break
-                    for ev in case.evidence:
-                        for note in ev.notes:
-                            if note.note_id == note_id:
-                                ev.notes.remove(note)
-                                deleted = True
-                                break
-                        if deleted:
-                            break
-                    if deleted:
-                        break
+                deleted = self.storage.delete_note(self.current_note.note_id)
 
                 if deleted:
-                    self.storage.save_data()
                     self.show_message("Note deleted.")
                     # Return to previous view
                     self.current_view = getattr(self, 'previous_view', 'case_detail')
@@ -2853,29 +2817,10 @@ class TUI:
             preview = note_to_del.content[:50] + "..." if len(note_to_del.content) > 50 else note_to_del.content
             if self.dialog_confirm(f"Delete note: '{preview}'?"):
                 # Find and delete the note from its parent using note_id
-                deleted = False
                 note_id = note_to_del.note_id
-                for case in self.cases:
-                    for note in case.notes:
-                        if note.note_id == note_id:
-                            case.notes.remove(note)
-                            deleted = True
-                            break
-                    if deleted:
-                        break
-                    for ev in case.evidence:
-                        for note in ev.notes:
-                            if note.note_id == note_id:
-                                ev.notes.remove(note)
-                                deleted = True
-                                break
-                        if deleted:
-                            break
-                    if deleted:
-                        break
+                deleted = self.storage.delete_note(note_id)
 
                 if deleted:
-                    self.storage.save_data()
                     # Remove from tag_notes list as well
                     self.tag_notes = [n for n in self.tag_notes if n.note_id != note_id]
                     self.selected_index = min(self.selected_index, len(self.tag_notes) - 1) if self.tag_notes else 0
@@ -2894,29 +2839,10 @@ class TUI:
             preview = note_to_del.content[:50] + "..." if len(note_to_del.content) > 50 else note_to_del.content
             if self.dialog_confirm(f"Delete note: '{preview}'?"):
                 # Find and delete the note from its parent using note_id
-                deleted = False
                 note_id = note_to_del.note_id
-                for case in self.cases:
-                    for note in case.notes:
-                        if note.note_id == note_id:
-                            case.notes.remove(note)
-                            deleted = True
-                            break
-                    if deleted:
-                        break
-                    for ev in case.evidence:
-                        for note in ev.notes:
-                            if note.note_id == note_id:
-                                ev.notes.remove(note)
-                                deleted = True
-                                break
-                        if deleted:
-                            break
-                    if deleted:
-                        break
+                deleted = self.storage.delete_note(note_id)
 
                 if deleted:
-                    self.storage.save_data()
                     # Remove from ioc_notes list as well
                     self.ioc_notes = [n for n in self.ioc_notes if n.note_id != note_id]
                     self.selected_index = min(self.selected_index, len(self.ioc_notes) - 1) if self.ioc_notes else 0
@@ -3187,46 +3113,52 @@ class TUI:
         filename = f"iocs_{context_name}_{timestamp}.txt"
         filepath = export_dir / filename
 
-        # Build export content
-        lines = []
-        lines.append(f"# IOC Export - {context_name}")
-        lines.append(f"# Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append("")
+        # Write to file, one line at a time
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                lines = self._iter_ioc_export_lines(context_name)
+                f.write(next(lines, ""))
+                for line in lines:
+                    f.write("\n")
+                    f.write(line)
+            self.show_message(f"IOCs exported to: {filepath}")
+        except Exception as e:
+            self.show_message(f"Export failed: {str(e)}")
+
+    def _iter_ioc_export_lines(self, context_name):
+        """Yield the lines of an IOC export for the active context"""
+        import datetime
+
+        yield f"# IOC Export - {context_name}"
+        yield f"# Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield ""
 
         if self.active_evidence:
             # Evidence context - only evidence IOCs
-            lines.append(f"## Evidence: {self.active_evidence.name}")
-            lines.append("")
+            yield f"## Evidence: {self.active_evidence.name}"
+            yield ""
             for ioc, count, ioc_type in self.current_iocs:
-                lines.append(f"{ioc}\t[{ioc_type}]\t({count} occurrences)")
+                yield f"{ioc}\t[{ioc_type}]\t({count} occurrences)"
         elif self.active_case:
             # Case context - show case IOCs + evidence IOCs with separators
             # Get case notes IOCs
             case_iocs = self._get_all_iocs_with_counts(self.active_case.notes)
             if case_iocs:
-                lines.append("## Case Notes")
-                lines.append("")
+                yield "## Case Notes"
+                yield ""
                 for ioc, count, ioc_type in case_iocs:
-                    lines.append(f"{ioc}\t[{ioc_type}]\t({count} occurrences)")
-                lines.append("")
+                    yield f"{ioc}\t[{ioc_type}]\t({count} occurrences)"
+                yield ""
 
             # Get IOCs from each evidence
             for ev in self.active_case.evidence:
                 ev_iocs = self._get_all_iocs_with_counts(ev.notes)
                 if ev_iocs:
-                    lines.append(f"## Evidence: {ev.name}")
-                    lines.append("")
+                    yield f"## Evidence: {ev.name}"
+                    yield ""
                     for ioc, count, ioc_type in ev_iocs:
-                        lines.append(f"{ioc}\t[{ioc_type}]\t({count} occurrences)")
-                    lines.append("")
-
-        # Write to file
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(lines))
-            self.show_message(f"IOCs exported to: {filepath}")
-        except Exception as e:
-            self.show_message(f"Export failed: {str(e)}")
+                        yield f"{ioc}\t[{ioc_type}]\t({count} occurrences)"
+                    yield ""
 
     def export_case_markdown(self):
         """Export current case (and all its evidence) to markdown"""
@@ -3411,18 +3343,8 @@ def run_tui(open_active=False):
                     key = stdscr.getch()
                     if key == ord('1'):
                         # Start fresh - need to create storage with empty data
-                        from .storage import Storage, DEFAULT_APP_DIR
-                        storage = Storage.__new__(Storage)
-                        storage.app_dir = DEFAULT_APP_DIR
-                        storage.data_file = storage.app_dir / "data.json"
-                        storage.lock_file = storage.app_dir / "app.lock"
-                        storage.lock_manager = None
-                        storage._ensure_app_dir()
-                        # Acquire lock
-                        from .storage import LockManager
-                        storage.lock_manager = LockManager(storage.lock_file)
-                        if not storage.lock_manager.acquire(timeout=5):
-                            raise RuntimeError("Another instance is running")
+                        from .storage import Storage
+                        storage = Storage.empty()
                         storage.start_fresh()
 
                         # Create TUI with the fresh storage